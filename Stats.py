@@ -57,6 +57,8 @@ single_point_analysis = False
 leadlag = False             # Comparing model and observations might be better than this
 leadlag_str = "-1"          # + is forward in time, - is backwards in time, # of stemps
                             # + is number of time-steps forward/backward in the observations
+model_pool_size = None      # Model runs kept open between the variable loops
+                            # (None = cases x versions: each run is opened only once)
 
 init_stats = StatConfig(cases_times=casestudy_time,\
                         case_versions=independent_var,\
@@ -69,9 +71,13 @@ init_stats = StatConfig(cases_times=casestudy_time,\
                         analysis_interval_min=analysis_interval_min,\
                         single_point_analysis=single_point_analysis,\
                         save_results=save_results,\
-                        leadlag=leadlag,leadlag_str=leadlag_str)
+                        leadlag=leadlag,leadlag_str=leadlag_str,\
+                        model_pool_size=model_pool_size)
 
 init_stats.set_data_dir(data_directory)
+#Keep variables calculated by wrf-python between runs (None = off)
+#e.g. os.path.join(os.getcwd(), "Data", "wrf_cache")
+init_stats.set_cache_dir(None, max_gb=20.)
 init_stats.set_csv_out_dir(os.path.join(os.getcwd(), "Data", "WRF_Analysis"))
 init_stats.set_stats_header(["OBS", "PRED", "MAE", "RMSE", "BIAS", "MAD", "NSE"])
 init_stats.set_marine_list(["FM-13 SHIP", "FM-18 BUOY", "FM-19 BUOY"])
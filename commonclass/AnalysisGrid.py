@@ -106,6 +106,18 @@ class AnalysisGrid:
         """setter"""
         cls.filter_area = number
 
+    @classmethod
+    def get_read_window(cls):
+        """Grid points (south, north, west, east) of theta needed to upscale the analysis box"""
+        return (max(cls.south_start-cls.cell_size, 0), cls.north_end+cls.cell_size,\
+                max(cls.west_start-cls.cell_size, 0), cls.east_end+cls.cell_size)
+
+    @classmethod
+    def get_config(cls):
+        """Arguments needed to rebuild this grid (e.g. in another process)"""
+        return (cls.level, cls.dx_1, cls.cell_size, cls.gradient_distance, cls.west_start,\
+                cls.east_end, cls.south_start, cls.north_end, cls.threshold, cls.filter_area)
+
     @classmethod
     def print_info(cls):
         """Print the Detection Info from the namelist file"""
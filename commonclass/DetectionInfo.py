@@ -21,7 +21,20 @@ class DetectionInfo:
                  case_versions=list(),\
                  variable="Potential Temperature",\
                  domain_number=1,\
-                 save_results=True):
+                 save_results=True,\
+                 batch_mode=False,\
+                 lazy_read=False,\
+                 output_format="csv",\
+                 plot_processes=0,\
+                 plot_max_pending=8,\
+                 tracking=False,\
+                 track_band=10,\
+                 profile=False,\
+                 resume=False,\
+                 levels=None,\
+                 precision="float64",\
+                 cache_directory=None,\
+                 cache_max_gb=20.):
 
         #Set Detection Wishes
         self.set_domain(domain_number)
@@ -29,6 +42,19 @@ class DetectionInfo:
         self.initialize_versions(case_versions)
         self.set_save(save_results)
         self.set_variable(variable)
+        self.set_batch(batch_mode)
+        self.set_lazy_read(lazy_read)
+        self.set_output_format(output_format)
+        self.set_plot_processes(plot_processes)
+        self.set_plot_max_pending(plot_max_pending)
+        self.set_tracking(tracking)
+        self.set_track_band(track_band)
+        self.set_profile(profile)
+        self.set_resume(resume)
+        self.set_levels(levels)
+        self.set_precision(precision)
+        self.set_cache_directory(cache_directory)
+        self.set_cache_max_gb(cache_max_gb)
 
     @classmethod
     def set_domain(cls, number):
@@ -55,6 +81,79 @@ class DetectionInfo:
         """Set variable"""
         cls.variable = string
 
+    @classmethod
+    def set_batch(cls, boolean):
+        """Detect the front for all time steps at once (True) or one at a time (False)"""
+        cls.batch_mode = boolean
+
+    @classmethod
+    def set_lazy_read(cls, boolean):
+        """Read theta one level/window/time step at a time instead of all up front"""
+        cls.lazy_read = boolean
+
+    @classmethod
+    def set_output_format(cls, string):
+        """Format of the 2D theta/frontal strength output: "csv" (one file per time step)
+        or "netcdf" (one compressed file per case/version)"""
+        if string not in ("csv", "netcdf"):
+            sys.exit("Output format must be csv or netcdf. Exiting...")
+        cls.output_format = string
+
+    @classmethod
+    def set_plot_processes(cls, number):
+        """Number of background processes saving the plots (0 = plot in the main process)"""
+        cls.plot_processes = int(number)
+
+    @classmethod
+    def set_plot_max_pending(cls, number):
+        """Most figures waiting for the plotting processes at once (bounds their memory)"""
+        cls.plot_max_pending = int(number)
+
+    @classmethod
+    def set_tracking(cls, boolean):
+        """Search near the front of the previous time step first and save its speed (True)
+        or search the full analysis window every time step (False)"""
+        cls.tracking = boolean
+
+    @classmethod
+    def set_track_band(cls, number):
+        """Number of columns searched on either side of the previous front when tracking"""
+        cls.track_band = int(number)
+
+    @classmethod
+    def set_profile(cls, boolean):
+        """Record the time and peak memory of each stage (PROFILE_*.csv and a summary)"""
+        cls.profile = boolean
+
+    @classmethod
+    def set_resume(cls, boolean):
+        """Skip case/versions finished in an earlier run and continue unfinished ones
+        at their last finished time step (needs save_results)"""
+        cls.resume = boolean
+
+    @classmethod
+    def set_levels(cls, lst):
+        """Model levels for the 3D analysis (find_front_levels). None = only AnalysisGrid.level"""
+        cls.levels = None if lst is None else sorted(lst)
+
+    @classmethod
+    def set_precision(cls, string):
+        """Precision of theta and the detection grids: "float64" or "float32"
+        (float32 reuses preallocated work arrays every time step)"""
+        if string not in ("float64", "float32"):
+            sys.exit("Precision must be float64 or float32. Exiting...")
+        cls.precision = string
+
+    @classmethod
+    def set_cache_directory(cls, string):
+        """Where variables calculated by wrf-python are kept between runs (None = not kept)"""
+        cls.cache_directory = string
+
+    @classmethod
+    def set_cache_max_gb(cls, number):
+        """Largest size of the cache directory in GB (least recently used entries go first)"""
+        cls.cache_max_gb = float(number)
+
     @classmethod
     def set_data_dir(cls, string):
         """This should be the parent directory for all model data"""
@@ -90,6 +189,30 @@ class DetectionInfo:
         """Clear all versions"""
         cls.independent_variables = list()
 
+    @classmethod
+    def get_config(cls):
+        """Settings needed to rebuild this instance (e.g. in another process)"""
+        return {"cases_times": list(cls.casestudy_times),\
+                "case_versions": list(cls.independent_variables),\
+                "variable": cls.variable,\
+                "domain_number": cls.domain,\
+                "save_results": cls.save_results,\
+                "batch_mode": cls.batch_mode,\
+                "lazy_read": cls.lazy_read,\
+                "output_format": cls.output_format,\
+                "plot_processes": cls.plot_processes,\
+                "plot_max_pending": cls.plot_max_pending,\
+                "tracking": cls.tracking,\
+                "track_band": cls.track_band,\
+                "profile": cls.profile,\
+                "resume": cls.resume,\
+                "levels": cls.levels,\
+                "precision": cls.precision,\
+                "cache_directory": cls.cache_directory,\
+                "cache_max_gb": cls.cache_max_gb,\
+                "data_directory": cls.data_directory,\
+                "wpsfile": cls.wpsfile}
+
     @classmethod
     def print_info(cls):
         """Print the Detection Info from the namelist file"""
@@ -102,5 +225,15 @@ class DetectionInfo:
         print("Domain Number: ", cls.domain)
         print("Variable: ", cls.variable)
         print("Save Results: ", cls.save_results)
+        print("Batch Mode: ", cls.batch_mode)
+        print("Lazy Read: ", cls.lazy_read)
+        print("2D Output Format: ", cls.output_format)
+        print("Plot Processes: ", cls.plot_processes, "(max pending:", cls.plot_max_pending, ")")
+        print("Front Tracking: ", cls.tracking, "(band:", cls.track_band, "columns)")
+        print("Profile Stages: ", cls.profile)
+        print("Resume: ", cls.resume)
+        print("3D Analysis Levels: ", cls.levels)
+        print("Precision: ", cls.precision)
+        print("Diagnostic Cache: ", cls.cache_directory, "(max", cls.cache_max_gb, "GB)")
         print()
         print()
@@ -0,0 +1,126 @@
+"""Copyright (C) 2018-Present E. Allen, D. Moore, D. Veron - University of Delaware"""
+#
+# You may use, distribute and modify this code under the
+# terms of the GNU Lesser General Public License v3.0 license.
+#
+# https://www.gnu.org/licenses/lgpl-3.0.en.html
+#
+# Imports
+from __future__ import print_function
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+
+class DiagnosticCache:
+    """
+    Derived WRF variables (theta, 10m wind, 2m dewpoint, ...) saved to .npy files so
+    they are only calculated by wrf-python once per model output.
+
+    An entry is keyed by the path, size and modification time of each wrfout file and
+    by the variable name and units, so a rewritten wrfout file is calculated again.
+    Entries are memory-mapped back (read only). Once the directory holds more than
+    max_gb, the least recently used entries are deleted.
+
+    Input:
+        directory (string) where the .npy files are kept
+        max_gb (float) largest size of the cache
+    Output:
+        class object
+    """
+    def __init__(self, directory, max_gb=20.):
+        self.directory = directory
+        self.max_bytes = int(max_gb * 1024**3)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, filenames, variable, units):
+        """key: Cache key of a variable calculated from the wrfout files
+
+        Input:
+            filenames (list) wrfout files of the model run
+            variable (string) variable name
+            units (string) units of the variable
+        Output:
+            (string) hex digest
+        """
+        files = []
+        for filename in filenames:
+            stat = os.stat(filename)
+            files.append([os.path.abspath(filename), stat.st_size, stat.st_mtime_ns])
+
+        text = json.dumps([files, variable, units])
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """get: Memory-mapped array for key (None = not in the cache)"""
+        filename = os.path.join(self.directory, key+".npy")
+        try:
+            data = np.load(filename, mmap_mode="r")
+        except (IOError, OSError, ValueError):
+            return None
+
+        #Most recently used = newest modification time
+        os.utime(filename, None)
+        return data
+
+    def put(self, key, data):
+        """put: Save data for key and drop old entries beyond max_gb
+
+        Input:
+            key (string) from key()
+            data (array) variable values (masked values are saved as NaN)
+        Output:
+            (array) the cached data, memory-mapped
+        """
+        filename = os.path.join(self.directory, key+".npy")
+        data = np.ma.filled(data, np.nan) if np.ma.isMaskedArray(data) else np.asarray(data)
+
+        #Written to a temporary file of its own first so a partly written entry is never
+        #read and processes saving the same key at once do not write over each other
+        tmp_fd, tmpname = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(tmp_fd, "wb") as tmpfile:
+                np.save(tmpfile, data)
+            os.replace(tmpname, filename)
+        except OSError:
+            if os.path.exists(tmpname):
+                os.remove(tmpname)
+            #Another process has already saved this key (and it is in use)
+            cached = self.get(key)
+            if cached is None:
+                raise
+            return cached
+
+        self.evict()
+        cached = self.get(key)
+        return data if cached is None else cached
+
+    def evict(self):
+        """evict: Delete the least recently used entries until the cache fits in max_gb"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npy"):
+                #Other processes may delete entries at the same time
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(entry[1] for entry in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+def open_cache(directory, max_gb=20.):
+    """open_cache: DiagnosticCache in directory, None when directory is None"""
+    if directory is None:
+        return None
+    return DiagnosticCache(directory, max_gb)
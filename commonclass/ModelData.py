@@ -11,9 +11,29 @@ import os
 import sys
 import glob
 from datetime import datetime
+import numpy as np
 from netCDF4 import Dataset
 import wrf
 from wrf import getvar
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from commonclass.WrfoutSet import WrfoutSet
+from commonclass.StationPoints import StationPoints, wind_speed_direction
+
+#Units of the variables from get_wrf_data (part of the DiagnosticCache key)
+WRF_UNITS = {'Wind_Speed (m/s)': 'm s-1',\
+             'Wind_Direction (deg)': 'degrees',\
+             'Air_Temperature (K)': 'K',\
+             'Dewpoint_Temperature (K)': 'K',\
+             'Potential Temperature': 'K',\
+             'th': 'K',\
+             'theta': 'K',\
+             'Relative Humidity (%)': '%',\
+             'Pressure (Pa)': 'Pa',\
+             'U10': 'm s-1',\
+             'V10': 'm s-1'}
+
+#Variables calculated together from one get_uvmet10 call (calc_wind_products)
+WIND_PRODUCTS = ('U10', 'V10', 'Wind_Speed (m/s)', 'Wind_Direction (deg)')
 
 class ModelData:
     """
@@ -21,12 +41,19 @@ class ModelData:
 
     Developed by Eric Allen, University of Delaware
 
+    The state (open file, wrf_var, time_idx, wrf_dt, ...) belongs to each instance, so
+    several model runs can be held and processed at the same time.
+
     Input:
         case (string) case time
         version (string) Sensitivity test version
-        var (string) Variable name
+        var (string) Variable name (None = nothing read up front, e.g. get_station_data)
         domain (string) 2-char string domain number "02"
         path (string) path to the model data
+        clear_ncfile (bool) drop the netcdf file from memory once the data has been read
+        lazy (bool) do not read potential temperature up front, get_level_data reads
+                    one level/window/time step at a time from the open file instead
+        cache (DiagnosticCache) reuse variables calculated from this model output before
     Output:
         class object
     """
@@ -36,7 +63,9 @@ class ModelData:
                  var,\
                  domain,\
                  path,\
-                 clear_ncfile=False):
+                 clear_ncfile=False,\
+                 lazy=False,\
+                 cache=None):
 
         if path is None:
             sys.exit("No Path to Model Data")
@@ -45,9 +74,17 @@ class ModelData:
 
         self.set_version(version)
 
+        self.set_cache(cache)
         self.set_open_file()
 
-        self.get_wrf_data(var)
+        self.landvalues = None
+        self.station_points = None
+        self.variable = var
+        self.set_lazy(lazy and var in ("Potential Temperature", "th", "theta"))
+        if self.lazy or var is None:
+            self.clear_wrf_var()
+        else:
+            self.get_wrf_data(var)
 
         self.get_wrf_datetime_obj()
 
@@ -57,6 +94,9 @@ class ModelData:
         self.lons = getvar(self.ncfile, "XLONG", timeidx=0, method='cat',\
                            squeeze=True, cache=None, meta=False)
 
+        #Read once - shared by get_static_field
+        self.static = {"XLAT": self.lats, "XLONG": self.lons}
+
         self.set_lat_dimension()
         self.set_lon_dimension()
         self.set_vert_dimension()
@@ -66,22 +106,33 @@ class ModelData:
         #Likely not the right path.... Will need to be set correctly later
         self.set_namelistwps(os.getcwd()+'/namelist.wps')
         self.set_save(None)
-
-        #Clear from memory
-        if clear_ncfile:
+        self.set_store(None)
+        self.set_plot_queue(None)
+        self.set_profiler(None)
+        self.set_workspace(None)
+        self.datapath = None
+        self.mappath = None
+
+        #Clear from memory (lazy reads need the file)
+        if clear_ncfile and not self.lazy:
             self.clear_ncfile()
 
-    @classmethod
-    def set_open_file(cls):
-        """set filename and get the data"""
-        listing = glob.glob(cls.filelocname)
-        if os.path.exists(listing[0]):
-            cls.ncfile = Dataset(listing[0])
-        else:
+    def set_open_file(self):
+        """set filename and get the data
+
+        A run written to several wrfout files is opened as a WrfoutSet (one Time axis,
+        files read only when their time steps are needed).
+        """
+        listing = sorted(glob.glob(self.filelocname))
+        if not listing or not os.path.exists(listing[0]):
             sys.exit("FILE NOT FOUND IN PROVIDED PATH AND/OR FILENAME")
+        elif len(listing) == 1:
+            self.ncfile = Dataset(listing[0])
+        else:
+            self.ncfile = WrfoutSet(listing)
+        self.filenames = listing
 
-    @classmethod
-    def fmt_run_path(cls, case, independent_var, domain, path_pwd):
+    def fmt_run_path(self, case, independent_var, domain, path_pwd):
         """
         SETS FILE FORMAT FOR CASES AND THEIR VARIATIONS
         Files should be arranged and named so you can simply look through.
@@ -108,13 +159,80 @@ class ModelData:
 
         model_path = path_pwd+simulation+filename
 
-        cls.filelocname = model_path
-        cls.case_time = short_time
+        self.filelocname = model_path
+        self.case_time = short_time
+
+
+    def get_wrf_data(self, variable):
+        """get_wrf_data: Set wrf_var to all the data associated with variable
+
+        Input:
+            variable (string) string with a valid variable name
+        """
+        self.variable = variable
+        self.wrf_var = self.get_wrf_products([variable])[variable]
+
+    def get_wrf_products(self, variables):
+        """get_wrf_products: All the data associated with each variable
+
+        Each wrf-python calculation runs once for all of the variables that come
+        from it: U10, V10, Wind_Speed (m/s) and Wind_Direction (deg) share one
+        rotation of the 10m wind to earth coordinates. With a DiagnosticCache the data
+        is memory-mapped from the cache when this model output was calculated before,
+        and saved to it otherwise.
+
+        Input:
+            variables (list) valid variable names
+        Output:
+            products (dict) variable name -> data
+        """
+        products = {}
+        keys = {}
+        if self.cache is not None:
+            for variable in variables:
+                keys[variable] = self.cache.key(self.filenames, variable,\
+                                                WRF_UNITS.get(variable, ""))
+                products[variable] = self.cache.get(keys[variable])
+
+        missing = [variable for variable in variables if products.get(variable) is None]
+        wind = [variable for variable in missing if variable in WIND_PRODUCTS]
+        calculated = self.calc_wind_products(wind) if wind else {}
+        for variable in missing:
+            if variable not in calculated:
+                calculated[variable] = self.calc_wrf_data(variable)
+
+        for variable, data in calculated.items():
+            products[variable] = data if self.cache is None else\
+                                 self.cache.put(keys[variable], data)
+        return products
+
+    def calc_wind_products(self, variables):
+        """calc_wind_products: 10m wind variables from a single get_uvmet10 call
+
+        Same values as get_uvmet10 (U10, V10) and get_uvmet10_wspd_wdir (speed and
+        direction), which rotates the wind again for every call.
+
+        Input:
+            variables (list) names from WIND_PRODUCTS
+        Output:
+            (dict) variable name -> data
+        """
+        #10m wind rotated to earth coordinates   UNIT m/s
+        uvmet10 = wrf.g_uvmet.get_uvmet10(self.ncfile, timeidx=wrf.ALL_TIMES,\
+                                          method='cat', squeeze=True, cache=None,\
+                                          meta=False, _key=None, units='m s-1')
+        data = {"U10": uvmet10[0], "V10": uvmet10[1]}
+
+        if "Wind_Speed (m/s)" in variables or "Wind_Direction (deg)" in variables:
+            #As get_uvmet10_wspd_wdir: speed UNIT m/s and direction in degrees
+            wspd_wdir = wind_speed_direction(uvmet10[0], uvmet10[1])
+            data["Wind_Speed (m/s)"] = wspd_wdir[0]
+            data["Wind_Direction (deg)"] = wspd_wdir[1]
 
+        return {variable: data[variable] for variable in variables}
 
-    @classmethod
-    def get_wrf_data(cls, variable):
-        """get_wrf_data: Add your data accordingly here.  What variables will you need?
+    def calc_wrf_data(self, variable):
+        """calc_wrf_data: Add your data accordingly here.  What variables will you need?
 
         May need to add to this in the future
 
@@ -122,35 +240,29 @@ class ModelData:
             ncfile (netCDF4) netcdf file that contains the wrf model output
             variable (string) string with a valid variable name
         Output:
-            wrf_var (array) All the data associated with that variable
+            data (array) All the data associated with that variable
         """
-        if variable == 'Wind_Speed (m/s)':#10m wind speed    UNIT m/s
-            data = wrf.g_uvmet.get_uvmet10_wspd_wdir(cls.ncfile, timeidx=wrf.ALL_TIMES,\
-                                                    method='cat', squeeze=True, cache=None,\
-                                                    meta=False, _key=None, units='m s-1')[0]
-
-        elif variable == 'Wind_Direction (deg)':#10m wind direction UNIT m/s and degrees
-            data = wrf.g_uvmet.get_uvmet10_wspd_wdir(cls.ncfile, timeidx=wrf.ALL_TIMES,\
-                                                    method='cat', squeeze=True, cache=None,\
-                                                    meta=False, _key=None, units='m s-1')[1]
+        #10m wind speed/direction, U10, V10 - see calc_wind_products
+        if variable in WIND_PRODUCTS:
+            data = self.calc_wind_products([variable])[variable]
 
         #2m air temperature KELVIN
         elif variable == 'Air_Temperature (K)':
-            data = wrf.getvar(cls.ncfile, "T2", timeidx=wrf.ALL_TIMES, method='cat',\
+            data = wrf.getvar(self.ncfile, "T2", timeidx=wrf.ALL_TIMES, method='cat',\
                                                  squeeze=True, cache=None, meta=False)
 
         #2m dewpoint temperature KELVIN
         elif variable == 'Dewpoint_Temperature (K)':
-            data = wrf.g_dewpoint.get_dp_2m(cls.ncfile, timeidx=wrf.ALL_TIMES,\
+            data = wrf.g_dewpoint.get_dp_2m(self.ncfile, timeidx=wrf.ALL_TIMES,\
                                            method='cat', squeeze=True, cache=None,\
                                            meta=False, _key=None, units='K')
         elif variable in ("Potential Temperature", "th", "theta"):
-            data = wrf.g_temp.get_theta(cls.ncfile, timeidx=wrf.ALL_TIMES,\
+            data = wrf.g_temp.get_theta(self.ncfile, timeidx=wrf.ALL_TIMES,\
                                    method='cat', squeeze=True, cache=None,\
                                    meta=False, _key=None, units='K')
         #2m relative humidity   UNIT: %
         elif variable == "Relative Humidity (%)":
-            data = wrf.g_rh.get_rh_2m(cls.ncfile, timeidx=wrf.ALL_TIMES,\
+            data = wrf.g_rh.get_rh_2m(self.ncfile, timeidx=wrf.ALL_TIMES,\
                                      method='cat', squeeze=True, cache=None,\
                                      meta=False, _key=None)
 
@@ -158,151 +270,348 @@ class ModelData:
         elif variable == "Pressure (Pa)":
             #wrf-python is absolute garbage with about 10% usefulness. This will only work
             #one at a time.
-            data = wrf.g_slp.get_slp(cls.ncfile, timeidx=wrf.ALL_TIMES,\
+            data = wrf.g_slp.get_slp(self.ncfile, timeidx=wrf.ALL_TIMES,\
                                         method='cat', squeeze=True, cache=None,\
                                         meta=False, _key=None, units='Pa')
-        elif variable == "U10":
-            data = wrf.g_uvmet.get_uvmet10(cls.ncfile, timeidx=wrf.ALL_TIMES,\
-                                              method='cat', squeeze=True, cache=None,\
-                                              meta=False, _key=None, units='m s-1')[0]
-
-        elif variable == "V10":
-            data = wrf.g_uvmet.get_uvmet10(cls.ncfile, timeidx=wrf.ALL_TIMES,\
-                                          method='cat', squeeze=True, cache=None,\
-                                          meta=False, _key=None, units='m s-1')[1]
 
         else:
             try:
-                data = wrf.getvar(cls.ncfile, variable, timeidx=wrf.ALL_TIMES,\
+                data = wrf.getvar(self.ncfile, variable, timeidx=wrf.ALL_TIMES,\
                                  method='cat', squeeze=True, cache=None, meta=False)
             except:
                 sys.exit("INVALID VARIABLE OPTION")
 
-        cls.wrf_var = data
+        return data
     
-    @classmethod
-    def get_landmask(cls):
-        cls.landvalues = wrf.getvar(cls.ncfile, "LANDMASK", timeidx=wrf.ALL_TIMES,\
-                                 method='cat', squeeze=True, cache=None, meta=False)
-    @classmethod
-    def set_version(cls, string):
+    def get_station_data(self, points, variables, halo=1, time_window=None):
+        """get_station_data: Variables only at station grid points and the points around them
+
+        Only the stencil around each station is read from the file, and the derived
+        variables are calculated on those points alone (see StationPoints). The stencils
+        are kept for the next call with the same points and time window, so the variables
+        of a run share their reads (e.g. T2, Q2 and PSFC).
+
+        Input:
+            points (list) (south_north, west_east) grid index of each station
+            variables (list) valid variable names (as get_wrf_data, or any wrfout variable)
+            halo (int) grid points read on each side of the station (1 = 3x3 stencil)
+            time_window (tuple) (start, end) datetimes of the time steps read (None = all)
+        Output:
+            steps (array) time indexes (into wrf_dt) that were read
+            data (dict) variable name -> (time, ..., npoints, 2*halo+1, 2*halo+1)
+        """
+        steps = slice(None)
+        if time_window is not None:
+            steps = slice(np.searchsorted(self.wrf_dt64, np.datetime64(time_window[0], "us"),\
+                                          side="left"),\
+                          np.searchsorted(self.wrf_dt64, np.datetime64(time_window[1], "us"),\
+                                          side="right"))
+
+        key = (tuple((int(y), int(x)) for y, x in points), halo, steps.start, steps.stop)
+        if self.station_points is None or self.station_points[0] != key:
+            self.station_points = (key, StationPoints(self.ncfile, points, halo=halo,\
+                                                      steps=steps))
+        station = self.station_points[1]
+        return np.arange(len(self.wrf_dt64))[steps],\
+               {variable: station.get_data(variable) for variable in variables}
+
+    def get_level_data(self, level, window=None, all_times=False, work=None, time_idx=None):
+        """get_level_data: wrf_var at one model level
+
+        When the data was not read up front (lazy), potential temperature is read
+        from the netcdf file for the requested time(s), level and window only
+        (read_level_data, then level_theta).
+
+        Input:
+            level (int/slice/list) model level, or a slice or ascending list of levels
+                                   (adds a level dimension)
+            window (tuple) (south, north, west, east) grid points to read. None = all
+            all_times (bool) all time steps (True) or only one time step (False)
+            work (Workspace) reuse its "theta" array and precision for lazy reads
+            time_idx (int) time step read when all_times is False (None = current time_idx)
+        Output:
+            (array) ([time,] [level,] south_north, west_east).
+                    NaN outside of the window when read lazily.
+        """
+        if not self.lazy:
+            if all_times:
+                time_idx = slice(None)
+            elif time_idx is None:
+                time_idx = self.time_idx
+            return self.wrf_var[time_idx, level, :, :]
+
+        return self.level_theta(self.read_level_data(level, window, all_times, time_idx),\
+                                window, work)
+
+    def read_level_data(self, level, window=None, all_times=False, time_idx=None):
+        """read_level_data: Perturbation potential temperature (T) from the netcdf file
+
+        Input:
+            level, window, all_times, time_idx -- as get_level_data
+        Output:
+            (masked array) ([time,] [level,] window rows, window columns)
+        """
+        if all_times:
+            time_idx = slice(None)
+        elif time_idx is None:
+            time_idx = self.time_idx
+        south, north, west, east = self.full_window(window)
+        return self.ncfile.variables["T"][time_idx, level, south:north, west:east]
+
+    def level_theta(self, pert_theta, window=None, work=None):
+        """level_theta: Potential temperature on the model grid from read_level_data
+
+        Input:
+            pert_theta (masked array) from read_level_data with the same window
+            window (tuple) (south, north, west, east) window it was read for. None = all
+            work (Workspace) reuse its "theta" array and precision
+        Output:
+            (array) ([time,] [level,] south_north, west_east), NaN outside of the window
+        """
+        south, north, west, east = self.full_window(window)
+
+        #Potential temperature = perturbation potential temperature + 300 K (as wrf-python)
+        shape = np.shape(pert_theta)[:-2] + (self.lat_dim, self.lon_dim)
+        if work is None:
+            data = np.full(shape, np.nan, dtype=pert_theta.dtype)
+        else:
+            data = work.get("theta", shape)
+            data.fill(np.nan)
+        data[..., south:north, west:east] = np.ma.filled(pert_theta, np.nan) +\
+                                            wrf.Constants.T_BASE
+        return data
+
+    def full_window(self, window):
+        """full_window: (south, north, west, east) of window, the whole grid when None"""
+        if window is None:
+            return (0, self.lat_dim, 0, self.lon_dim)
+        return window
+
+    def set_precision(self, dtype):
+        """Convert data read up front (wrf_var) to dtype, e.g. np.float32 to halve its memory
+        Input:
+            dtype (numpy dtype)
+        """
+        if self.wrf_var is not None:
+            self.wrf_var = np.asarray(self.wrf_var).astype(dtype, copy=False)
+
+    def get_level_heights(self, levels, time_idx=0):
+        """get_level_heights: Height above ground (m) of model levels at one time step
+
+        Mass levels are halfway between the staggered levels of PH + PHB (geopotential).
+        Only the staggered levels around the requested levels are read.
+
+        Input:
+            levels (list) model levels
+            time_idx (int) time step
+        Output:
+            (array) (level, south_north, west_east), None if the netcdf file was cleared
+        """
+        if self.ncfile is None:
+            return None
+
+        levels = np.asarray(levels)
+        staggered = np.union1d(levels, levels+1)
+        geopotential = self.ncfile.variables["PH"][time_idx, staggered] +\
+                       self.ncfile.variables["PHB"][time_idx, staggered]
+        lower = np.searchsorted(staggered, levels)
+        upper = np.searchsorted(staggered, levels+1)
+        height = (geopotential[lower] + geopotential[upper]) * 0.5 / wrf.Constants.G
+        return np.ma.filled(height - self.ncfile.variables["HGT"][time_idx], np.nan)
+
+    def get_static_field(self, name):
+        """get_static_field: A field that does not change with time, read once as 2-D
+
+        The field is read at the first and the last time step. When they are the same
+        it is kept as 2-D (south_north, west_east), otherwise (e.g. a moving nest) every
+        time step is read. XLAT and XLONG are the lats and lons read at the first time.
+
+        Input:
+            name (string) wrf variable name, e.g. "LANDMASK"
+        Output:
+            (array) 2-D, or 3-D (time, south_north, west_east) if it changes with time
+        """
+        if name not in self.static:
+            first = wrf.getvar(self.ncfile, name, timeidx=0, method='cat',\
+                               squeeze=True, cache=None, meta=False)
+            last = wrf.getvar(self.ncfile, name, timeidx=len(self.wrf_dt)-1, method='cat',\
+                              squeeze=True, cache=None, meta=False)
+            if np.array_equal(first, last):
+                self.static[name] = first
+            else:
+                self.static[name] = wrf.getvar(self.ncfile, name, timeidx=wrf.ALL_TIMES,\
+                                               method='cat', squeeze=True, cache=None,\
+                                               meta=False)
+        return self.static[name]
+
+    def get_landmask(self):
+        """Read LANDMASK into landvalues (once, 2-D when it does not change with time)"""
+        if self.landvalues is None:
+            self.landvalues = self.get_static_field("LANDMASK")
+
+    def get_landmask_step(self, idx):
+        """LANDMASK (2-D) at time step idx - see get_landmask"""
+        if self.landvalues.ndim == 2:
+            return self.landvalues
+        return self.landvalues[idx, :, :]
+
+    def set_cache(self, cache):
+        """Set where calculated variables are kept between runs (None = not kept)
+        Input:
+            cache (DiagnosticCache)
+        """
+        self.cache = cache
+
+    def set_version(self, string):
         """set sensitivity test name
         Input:
             string (str)
         """
-        cls.version = string
+        self.version = string
 
-    @classmethod
-    def set_timestep(cls, idx):
+    def set_lazy(self, boolean):
+        """Read potential temperature lazily (True) or all at once (False)
+        Input:
+            boolean (bool)
+        """
+        self.lazy = boolean
+
+    def clear_wrf_var(self):
+        """Nothing read up front - see get_level_data"""
+        self.wrf_var = None
+
+    def set_timestep(self, idx):
         """Update the time index
         Input:
             number (int)
         """
-        cls.time_idx = idx
+        self.time_idx = idx
 
-    @classmethod
-    def set_namelistwps(cls, string):
+    def set_namelistwps(self, string):
         """Set the path to the namelist.wps file
         Input:
             string (str)
         """
-        cls.wpsfile = string
+        self.wpsfile = string
 
-    @classmethod
-    def set_save(cls, boolean):
+    def set_save(self, boolean):
         """Set the boolean to determine what is saved
         Input:
             boolean (bool)
         """
-        cls.save = boolean
+        self.save = boolean
+
+    def set_store(self, store):
+        """Set where the 2D fields are saved (None = csv files in datapath)
+        Input:
+            store (FrontStore)
+        """
+        self.store = store
+
+    def set_plot_queue(self, queue):
+        """Set where plots are saved (None = plot_data saves them itself)
+        Input:
+            queue (PlotQueue)
+        """
+        self.plot_queue = queue
 
-    @classmethod
-    def set_datapath(cls, string):
+    def set_workspace(self, workspace):
+        """Set the work arrays reused by the detection stages (None = new float64 arrays)
+        Input:
+            workspace (Workspace)
+        """
+        self.workspace = workspace
+
+    def set_profiler(self, profiler):
+        """Set where the timing of each stage is recorded (None = not recorded)
+        Input:
+            profiler (StageProfiler)
+        """
+        self.profiler = profiler
+
+    def set_datapath(self, string):
         """Update the path to store data. Verify its a valid path.
         Input:
             string (str)
         """
-        cls.datapath = string
+        self.datapath = string
 
-        if not os.path.exists(cls.datapath):
-            os.makedirs(cls.datapath)
+        #exist_ok: parallel_driver workers may create it at the same time
+        os.makedirs(self.datapath, exist_ok=True)
 
-    @classmethod
-    def set_mappath(cls, string):
+    def set_mappath(self, string):
         """Update the path to store plots. Verify its a valid path.
         Input:
             string (str)
         """
-        cls.mappath = string
+        self.mappath = string
 
-        if not os.path.exists(cls.mappath):
-            os.makedirs(cls.mappath)
+        #exist_ok: parallel_driver workers may create it at the same time
+        os.makedirs(self.mappath, exist_ok=True)
 
-    @classmethod
-    def set_lat_dimension(cls):
+    def set_lat_dimension(self):
         """get/set the size of the latitudinal dimension"""
-        cls.lat_dim = cls.ncfile.dimensions.get("south_north").size
+        self.lat_dim = self.ncfile.dimensions.get("south_north").size
 
-    @classmethod
-    def set_lon_dimension(cls):
+    def set_lon_dimension(self):
         """get/set the size of the longitudinal dimension"""
-        cls.lon_dim = cls.ncfile.dimensions.get("west_east").size
+        self.lon_dim = self.ncfile.dimensions.get("west_east").size
 
-    @classmethod
-    def set_vert_dimension(cls):
+    def set_vert_dimension(self):
         """get/set the size of the vertical dimension"""
-        cls.vert_dim = cls.ncfile.dimensions.get('bottom_top').size
+        self.vert_dim = self.ncfile.dimensions.get('bottom_top').size
 
-    @classmethod
-    def get_wrf_datetime_obj(cls):
-        """get_wrf_datetime_obj: Get wrf timesteps as datetime objects
+    def get_wrf_datetime_obj(self):
+        """get_wrf_datetime_obj: Get wrf timesteps as datetime64 and datetime objects
 
         Input:
             ncfile (netCDF4) netcdf file that contains the wrf model output
         Output:
+            wrf_dt64 (array) wrf model time steps as datetime64 (microseconds)
             wrf_dt (list) List of wrf model time steps as datetime objects
         """
-        #Get WRF time-step and reformat
-        wrf_times = wrf.extract_times(cls.ncfile, timeidx=wrf.ALL_TIMES,\
-                                  method='cat', squeeze=True, cache=None,\
-                                  meta=False, do_xtime=False).astype(str)
+        if isinstance(self.ncfile, WrfoutSet):
+            #Already indexed - no need to open every file
+            wrf_times = self.ncfile.times
+        else:
+            #Get WRF time-step (nanoseconds - there should only be microseconds)
+            wrf_times = wrf.extract_times(self.ncfile, timeidx=wrf.ALL_TIMES,\
+                                      method='cat', squeeze=True, cache=None,\
+                                      meta=False, do_xtime=False)
 
-        time_obj = [""] * len(wrf_times)
-        for ijk, time in enumerate(wrf_times):
-            # FOR SOME REASON THERE ARE 9 miliseconds precision when there should be 6
-            time_obj[ijk] = datetime.strptime(time[:-3], '%Y-%m-%dT%H:%M:%S.%f')
+        #Truncated to microseconds (as datetime)
+        time_obj = np.asarray(wrf_times).astype("datetime64[us]")
 
         diff_wrf = time_obj[-1] - time_obj[0]
-        wrf_timestep = (time_obj[1] - time_obj[0]).total_seconds()
-        tot_sec_wrf = diff_wrf.total_seconds()
+        wrf_timestep = time_obj[1] - time_obj[0]
 
-        if len(time_obj) != (tot_sec_wrf / wrf_timestep) + 1:
+        if len(time_obj) != (diff_wrf / wrf_timestep) + 1:
             sys.exit("WRF TIME NOT THE RIGHT LENGTH")
 
-        cls.wrf_dt = time_obj
+        self.wrf_dt64 = time_obj
+        self.wrf_dt = time_obj.tolist()
 
-    @classmethod
-    def clear_ncfile(cls):
+    def clear_ncfile(self):
         """Clear large file from memory"""
-        cls.ncfile = None
+        self.ncfile = None
+        self.station_points = None
 
-    @classmethod
-    def print_info(cls):
+    def print_info(self):
         """Print the Detection Info from the namelist file"""
         print("Model Data:")
         print("-----------")
-        print("Model Data Location: ", cls.filelocname)
+        print("Model Data Location: ", self.filelocname)
         print()
-        print("Case: ", cls.case_time)
-        print("Version: ", cls.version)
-        print("Time Index: ", cls.time_idx)
+        print("Case: ", self.case_time)
+        print("Version: ", self.version)
+        print("Time Index: ", self.time_idx)
         print()
-        print("Namelist.wps File: ", cls.wpsfile)
-        print("Output Data Location: ", cls.datapath)
-        print("Output Plot Location: ", cls.mappath)
+        print("Namelist.wps File: ", self.wpsfile)
+        print("Output Data Location: ", self.datapath)
+        print("Output Plot Location: ", self.mappath)
         print()
-        print("Netcdf File (should be None): ", cls.ncfile)
-        print("Save Results: ", cls.save)
-        print("Dimensions(vert-lat-lon): ", cls.vert_dim, cls.lat_dim, cls.lon_dim)
+        print("Netcdf File (should be None): ", self.ncfile)
+        print("Save Results: ", self.save)
+        print("Dimensions(vert-lat-lon): ", self.vert_dim, self.lat_dim, self.lon_dim)
         print()
         print()
@@ -0,0 +1,77 @@
+"""Copyright (C) 2018-Present E. Allen, D. Moore, D. Veron - University of Delaware"""
+#
+# You may use, distribute and modify this code under the
+# terms of the GNU Lesser General Public License v3.0 license.
+#
+# https://www.gnu.org/licenses/lgpl-3.0.en.html
+#
+# Imports
+from __future__ import print_function
+import os
+import sys
+from collections import OrderedDict
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from commonclass.ModelData import ModelData
+
+class ModelPool:
+    """
+    Opened ModelData kept between the loops of an analysis, keyed by (case, version,
+    domain), so a model run is opened (file found, XLAT/XLONG, times and LANDMASK
+    read) once instead of once per variable.
+
+    At most max_models are kept. The least recently used one is dropped when
+    another has to be opened - for full reuse max_models should be at least the
+    number of cases x versions looped over.
+
+    Input:
+        max_models (int) number of ModelData kept open
+        path (string) path to the model data
+        cache (DiagnosticCache) passed to every ModelData (None = no cache)
+    Output:
+        class object
+    """
+    def __init__(self, max_models, path, cache=None):
+        self.max_models = max(int(max_models), 1)
+        self.path = path
+        self.cache = cache
+        self.models = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, case, version, domain, var):
+        """get: ModelData for the model run with wrf_var set to var
+
+        Input:
+            case (string) case time
+            version (string) Sensitivity test version
+            domain (string) 2-char string domain number "02"
+            var (string) Variable name (None = no field read, e.g. for get_station_data)
+        Output:
+            wrf_data (class) ModelData
+        """
+        key = (case, version, domain)
+        if key in self.models:
+            self.hits += 1
+            self.models.move_to_end(key)
+            wrf_data = self.models[key]
+            if var is not None and wrf_data.variable != var:
+                wrf_data.get_wrf_data(var)
+            return wrf_data
+
+        self.misses += 1
+        wrf_data = ModelData(case=case, version=version, var=var, domain=domain,\
+                             path=self.path, cache=self.cache)
+        self.models[key] = wrf_data
+        while len(self.models) > self.max_models:
+            self.models.popitem(last=False)[1].clear_ncfile()
+        return wrf_data
+
+    def clear(self):
+        """clear: Drop every ModelData"""
+        while self.models:
+            self.models.popitem()[1].clear_ncfile()
+
+    def print_info(self):
+        """Print how often an open model run was reused"""
+        print("Model Pool: ", len(self.models), "open of", self.max_models,\
+              "  |||  Reused: ", self.hits, "  |||  Opened: ", self.misses)
@@ -11,10 +11,8 @@ import os
 import sys
 import glob
 import math
-from datetime import datetime
 import numpy as np
 import pandas as pd
-import wrf
 class ObsData:
     """
     Developed by Eric Allen, University of Delaware
@@ -140,18 +138,13 @@ class ObsData:
 
     @classmethod
     def get_obs_datetime_obj(cls):
-        """Get observation date-time data as datetime objects"""
-        obs_time = []
+        """Get observation date-time data as a datetime64 array (all rows at once)"""
         #SAMPLE: '2014-06-04T06:00:00.000000000'
-        year = np.array(cls.obs_data['YEAR'], dtype=int)
-        month = np.array(cls.obs_data['MONTH'], dtype=int)
-        day = np.array(cls.obs_data['DAY'], dtype=int)
-        hour = np.array(cls.obs_data['HOUR'], dtype=int)
-        minute = np.array(cls.obs_data['MINUTE'], dtype=int)
-        for idx in range(len(year)):
-            utc_dt = datetime(year[idx], month[idx], day[idx], hour[idx], minute[idx])
-            obs_time.append(utc_dt)
-        cls.t_time = obs_time
+        columns = {"year": "YEAR", "month": "MONTH", "day": "DAY", "hour": "HOUR",\
+                   "minute": "MINUTE"}
+        parts = pd.DataFrame({name: np.array(cls.obs_data[column], dtype=int)\
+                              for name, column in columns.items()})
+        cls.t_time = pd.to_datetime(parts).values
 
 # =============================================================================
 # =============================================================================
@@ -162,12 +155,13 @@ class ObsData:
 # =============================================================================
 # =============================================================================
     @classmethod
-    def remove_data_outside(cls, ncfile):
-        """Identify and remove any observations out of the range of the domain"""
-        dom_lat_max = np.max(wrf.g_latlon.get_lat(ncfile, timeidx=0, meta=False))
-        dom_lat_min = np.min(wrf.g_latlon.get_lat(ncfile, timeidx=0, meta=False))
-        dom_lon_max = np.max(wrf.g_latlon.get_lon(ncfile, timeidx=0, meta=False))
-        dom_lon_min = np.min(wrf.g_latlon.get_lon(ncfile, timeidx=0, meta=False))
+    def remove_data_outside(cls, lats, lons):
+        """Identify and remove any observations out of the range of the domain
+        (lats, lons: ModelData.lats and ModelData.lons - read once from the model output)"""
+        dom_lat_max = np.max(lats)
+        dom_lat_min = np.min(lats)
+        dom_lon_max = np.max(lons)
+        dom_lon_min = np.min(lons)
 
         # HANDLES LAT/LON OUTSIDE WRF DOMAIN
         out_of_range = cls.obs_data[(cls.obs_data.Latitude > dom_lat_max) |\
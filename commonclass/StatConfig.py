@@ -31,7 +31,8 @@ class StatConfig:
                  single_point_analysis=False,\
                  save_results=True,\
                  leadlag=False,\
-                 leadlag_str=str("-1")):
+                 leadlag_str=str("-1"),\
+                 model_pool_size=None):
 
         #Set Detection Wishes
         self.initialize_cases(cases_times)
@@ -52,6 +53,8 @@ class StatConfig:
         self._init_timeseries(False)
         self.toggle_leadlag(leadlag)
         self.set_leadlag_str(leadlag_str)
+        self.set_cache_dir(None)
+        self.set_model_pool_size(model_pool_size)
 
     @classmethod
     def get_analysis_window(cls, case_time):
@@ -220,6 +223,29 @@ class StatConfig:
             sys.exit("Directory containing model data not found. Exiting...")
 
 
+    @classmethod
+    def set_cache_dir(cls, string, max_gb=20.):
+        """Where variables calculated by wrf-python are kept between runs (None = not kept)"""
+        cls.cache_directory = string
+        cls.cache_max_gb = float(max_gb)
+
+    @classmethod
+    def set_model_pool_size(cls, number):
+        """Number of model runs kept open between the variable/version/case loops
+        (None = cases x versions: every run is opened once)"""
+        cls.model_pool_size = None if number is None else int(number)
+
+    @classmethod
+    def get_model_pool_size(cls):
+        """Size of the ModelPool - warns when not every run can be kept open"""
+        runs = len(cls.casestudy_times) * len(cls.independent_variables)
+        if cls.model_pool_size is None:
+            return max(runs, 1)
+        if cls.model_pool_size < runs:
+            print("WARNING: model_pool_size", cls.model_pool_size, "<", runs, "cases x versions."\
+                  " Every run is opened again for each variable (nothing is reused).")
+        return cls.model_pool_size
+
     @classmethod
     def set_csv_out_dir(cls, string):
         """This should be the parent directory for all model data"""
@@ -254,6 +280,8 @@ class StatConfig:
         print("Analysis Ending (hour): ", cls.analysis_end_hour)
         print("Analysis Length (hrs): ", cls.analysis_length_hrs)
         print("Analysis Interval (minutes): ", cls.analysis_interval_min)
+        print("Diagnostic Cache: ", cls.cache_directory)
+        print("Model Runs Kept Open: ", cls.model_pool_size, "(None = cases x versions)")
         print()
         #print("Use Lead-Lag Analysis: ", cls.leadlag)
         #print("Lead-Lag Increment: ", cls.leadlag_str)
@@ -0,0 +1,128 @@
+"""Copyright (C) 2018-Present E. Allen, D. Moore, D. Veron - University of Delaware"""
+#
+# You may use, distribute and modify this code under the
+# terms of the GNU Lesser General Public License v3.0 license.
+#
+# https://www.gnu.org/licenses/lgpl-3.0.en.html
+#
+# Imports
+from __future__ import print_function
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+import wrf
+
+class StationIndex:
+    """
+    Grid point (x, y) and land type of each station, found once per model grid with
+    a single ll_to_xy call for all of the stations instead of one call for every
+    matched observation at every time step.
+
+    A table is kept per grid (keyed by XLAT, XLONG and LANDMASK, so the model runs
+    of a domain share it), with one entry per station ID and location. With a
+    directory the tables are saved as station_index_<grid>.json and later runs only
+    project the stations they have not seen. The land type is LANDMASK at the first
+    time step, so it is only used when LANDMASK does not change with time.
+
+    Input:
+        directory (string) where the tables are kept (None = in memory only)
+    Output:
+        class object
+    """
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.tables = {}
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def grid_key(self, wrf_data):
+        """grid_key: Hex digest of the grid (XLAT, XLONG, LANDMASK) of a ModelData"""
+        wrf_data.get_landmask()
+        digest = hashlib.sha1()
+        for field in (wrf_data.lats, wrf_data.lons, wrf_data.get_landmask_step(0)):
+            digest.update(np.ascontiguousarray(field).tobytes())
+        return digest.hexdigest()
+
+    def get_table(self, key):
+        """get_table: {"ID|lat|lon": [x, y, land]} of the grid (read from the file once)"""
+        if key not in self.tables:
+            self.tables[key] = {}
+            if self.directory is not None:
+                try:
+                    with open(self.filename(key)) as tablefile:
+                        self.tables[key] = json.load(tablefile)
+                except (IOError, OSError, ValueError):
+                    pass
+        return self.tables[key]
+
+    def filename(self, key):
+        """filename: Where the table of grid key is saved"""
+        return os.path.join(self.directory, "station_index_"+key+".json")
+
+    def save(self, key):
+        """save: Write the table of grid key (through a temporary file)"""
+        if self.directory is None:
+            return
+        with open(self.filename(key)+".tmp", "w") as tablefile:
+            json.dump(self.tables[key], tablefile)
+        os.replace(self.filename(key)+".tmp", self.filename(key))
+
+    def locate(self, wrf_data, id_string, latitudes, longitudes):
+        """locate: Grid point and land type of every observation
+
+        Input:
+            wrf_data (class) ModelData
+            id_string (array) station ID of each observation (ObsData.id_string)
+            latitudes, longitudes (array) location of each observation
+        Output:
+            x_y (array) (2, nobs) as ll_to_xy - x_y[:, i] for observation i
+            land (array) LANDMASK at each observation (None when LANDMASK changes with time)
+        """
+        key = self.grid_key(wrf_data)
+        table = self.get_table(key)
+
+        #Each station (ID and location) once - the observation rows repeat them every time
+        rows = pd.DataFrame({"id": np.asarray(id_string).astype(str),\
+                             "lat": np.asarray(latitudes, dtype=float),\
+                             "lon": np.asarray(longitudes, dtype=float)})
+        station_of_row = rows.groupby(["id", "lat", "lon"], sort=False, dropna=False)\
+                             .ngroup().to_numpy()
+        stations = rows.iloc[np.unique(station_of_row, return_index=True)[1]]
+        names = [station+"|"+repr(float(lat))+"|"+repr(float(lon)) for station, lat, lon\
+                 in zip(stations["id"], stations["lat"], stations["lon"])]
+        valid = ~(np.isnan(stations["lat"].to_numpy()) | np.isnan(stations["lon"].to_numpy()))
+
+        #Every station not in the table yet - one ll_to_xy call for all of them
+        missing = {}
+        for name, lat, lon, good in zip(names, stations["lat"], stations["lon"], valid):
+            if good and name not in table:
+                missing[name] = (lat, lon)
+        if missing:
+            new_x_y = np.reshape(wrf.ll_to_xy(wrf_data.ncfile,\
+                                              np.array([loc[0] for loc in missing.values()]),\
+                                              np.array([loc[1] for loc in missing.values()]),\
+                                              meta=False), (2, -1))
+            landmask = wrf_data.get_landmask_step(0)
+            for name, x_pt, y_pt in zip(missing, new_x_y[0], new_x_y[1]):
+                try:
+                    land = float(landmask[int(y_pt), int(x_pt)])
+                except IndexError:
+                    land = None
+                table[name] = [int(x_pt), int(y_pt), land]
+            self.save(key)
+
+        station_x_y = np.zeros((2, len(names)), dtype=int)
+        station_land = np.full(len(names), np.nan)
+        for i, name in enumerate(names):
+            if valid[i]:
+                station_x_y[0, i], station_x_y[1, i] = table[name][:2]
+                station_land[i] = np.nan if table[name][2] is None else table[name][2]
+
+        #Back to one entry per observation row
+        x_y = station_x_y[:, station_of_row]
+        land = station_land[station_of_row]
+        if wrf_data.landvalues.ndim != 2:
+            land = None
+        return x_y, land
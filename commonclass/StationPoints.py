@@ -0,0 +1,212 @@
+"""Copyright (C) 2018-Present E. Allen, D. Moore, D. Veron - University of Delaware"""
+#
+# You may use, distribute and modify this code under the
+# terms of the GNU Lesser General Public License v3.0 license.
+#
+# https://www.gnu.org/licenses/lgpl-3.0.en.html
+#
+# Imports
+from __future__ import print_function
+from math import fabs, log, tan, sin, cos
+import numpy as np
+import wrf
+
+class StationPoints:
+    """
+    WRF variables read only at the station grid points and the points around them
+    (a 3x3 stencil for halo=1) instead of the whole (time, south_north, west_east) field.
+
+    The stencil of each station is read as one small hyperslab over the requested
+    time steps, so the I/O and memory scale with the number of stations instead of
+    the size of the domain. The stencils are put side by side as a
+    (npoints*size, size) grid and the derived variables are calculated on it with the
+    same wrf-python routines getvar uses. Those work column by column, so the values
+    agree with the full field at these points to floating point rounding (the
+    arithmetic around the routines, e.g. adding PH and PHB, is not always done in the
+    same order or precision - expect differences of about 1e-6 relative, not bit
+    equality). Stencil points outside of the domain are NaN. Both are checked against
+    the full fields on a synthetic wrfout by src_sfc_stats/check_station_points.py.
+
+    Input:
+        ncfile (netCDF4 Dataset or WrfoutSet) model output
+        points (list) (south_north, west_east) grid index of each station
+        halo (int) grid points read on each side of the station (1 = 3x3)
+        steps (slice) time steps read (None = all)
+    Output:
+        class object
+    """
+    def __init__(self, ncfile, points, halo=1, steps=None):
+        self.ncfile = ncfile
+        self.points = [(int(y), int(x)) for y, x in points]
+        self.halo = int(halo)
+        self.size = 2*self.halo + 1
+        self.steps = slice(None) if steps is None else steps
+        self.ny = ncfile.dimensions["south_north"].size
+        self.nx = ncfile.dimensions["west_east"].size
+        self.raw = {}
+        self.data = {}
+
+        #Stencil points off the grid are read from the nearest edge and set to NaN after
+        offsets = np.arange(-self.halo, self.halo+1)
+        self.rows, self.cols = [], []
+        outside = []
+        for y, x in self.points:
+            rows, cols = y + offsets, x + offsets
+            outside.append(((rows < 0) | (rows >= self.ny))[:, None] |\
+                           ((cols < 0) | (cols >= self.nx))[None, :])
+            self.rows.append(np.clip(rows, 0, self.ny-1))
+            self.cols.append(np.clip(cols, 0, self.nx-1))
+        self.outside = np.concatenate(outside) if outside else\
+                       np.zeros((0, self.size), dtype=bool)
+
+    def read(self, name):
+        """read: Variable name from the file at every stencil
+
+        Read once and kept for the other variables that need it.
+
+        Input:
+            name (string) wrfout variable name
+        Output:
+            (array) (time, ..., npoints*size, size)
+        """
+        if name not in self.raw:
+            var = self.ncfile.variables[name]
+            pieces = []
+            for rows, cols in zip(self.rows, self.cols):
+                data = np.ma.getdata(var[self.steps, ..., rows[0]:rows[-1]+1,\
+                                         cols[0]:cols[-1]+1])
+                pieces.append(data[..., rows-rows[0], :][..., cols-cols[0]])
+            self.raw[name] = np.concatenate(pieces, axis=-2)
+        return self.raw[name]
+
+    def get_data(self, variable):
+        """get_data: variable (a ModelData.calc_wrf_data name) at every stencil
+
+        Input:
+            variable (string) valid variable name
+        Output:
+            (array) (time, ..., npoints, size, size)
+        """
+        if variable not in self.data:
+            #ModelData.WIND_PRODUCTS
+            if variable in ("U10", "V10", "Wind_Speed (m/s)", "Wind_Direction (deg)"):
+                self.calc_wind()
+            else:
+                self.data[variable] = self.finish(self.calc_data(variable))
+        return self.data[variable]
+
+    def calc_data(self, variable):
+        """calc_data: Same calculation as ModelData.calc_wrf_data on the stencils"""
+        #2m air temperature KELVIN
+        if variable == 'Air_Temperature (K)':
+            data = self.read("T2")
+
+        #2m dewpoint temperature KELVIN - as get_dp_2m
+        elif variable == 'Dewpoint_Temperature (K)':
+            data = wrf.td(.01*self.read("PSFC"), np.maximum(self.read("Q2"), 0.),\
+                          meta=False, units='K')
+
+        elif variable in ("Potential Temperature", "th", "theta"):
+            data = self.read("T") + wrf.Constants.T_BASE
+
+        #2m relative humidity   UNIT: % - as get_rh_2m
+        elif variable == "Relative Humidity (%)":
+            data = wrf.rh(np.maximum(self.read("Q2"), 0.), self.read("PSFC"),\
+                          self.read("T2"), meta=False)
+
+        #SLP pressure UNITS: Pa - as get_slp
+        elif variable == "Pressure (Pa)":
+            full_p = self.read("P") + self.read("PB")
+            height = wrf.destagger((self.read("PH") + self.read("PHB")) / wrf.Constants.G,\
+                                   -3, meta=False)
+            tkel = wrf.tk(full_p, self.read("T") + wrf.Constants.T_BASE, meta=False)
+            data = wrf.slp(height, tkel, full_p, np.maximum(self.read("QVAPOR"), 0.),\
+                           meta=False, units='Pa')
+
+        else:
+            data = self.read(variable)
+
+        return data
+
+    def calc_wind(self):
+        """calc_wind: 10m wind rotated to earth coordinates, speed and direction (m/s, deg)
+
+        As ModelData.calc_wind_products (get_uvmet10).
+        """
+        u10 = self.read("U10")
+        v10 = self.read("V10")
+        rotation = map_rotation(self.ncfile)
+        if rotation is None:
+            uvmet10 = np.stack([u10, v10])
+        else:
+            uvmet10 = wrf.uvmet(u10, v10, self.read("XLAT"), self.read("XLONG"),\
+                                rotation[0], rotation[1], meta=False, units='m s-1')
+        wspd_wdir = wind_speed_direction(uvmet10[0], uvmet10[1])
+
+        self.data["U10"] = self.finish(uvmet10[0])
+        self.data["V10"] = self.finish(uvmet10[1])
+        self.data["Wind_Speed (m/s)"] = self.finish(wspd_wdir[0])
+        self.data["Wind_Direction (deg)"] = self.finish(wspd_wdir[1])
+
+    def finish(self, data):
+        """finish: NaN off the grid, (..., npoints*size, size) -> (..., npoints, size, size)"""
+        data = np.asarray(data)
+        if self.outside.any():
+            data = data.astype(np.result_type(data.dtype, np.float32))
+            data[..., self.outside] = np.nan
+        return data.reshape(data.shape[:-2] + (len(self.points), self.size, self.size))
+
+
+def wind_speed_direction(u10, v10):
+    """wind_speed_direction: Wind speed (m/s) and the direction it blows from (deg)
+
+    Same formulas as get_uvmet10_wspd_wdir (wrf_wind.f90 in wrf-python), which has no
+    public function for wind that has already been rotated. Calculated in float64 and
+    returned in the dtype of u10, as wrf-python does.
+
+    Input:
+        u10, v10 (array) earth-relative wind components (m/s)
+    Output:
+        (array) (2, ...) speed and direction
+    """
+    u_wind = np.asarray(u10, dtype=np.float64)
+    v_wind = np.asarray(v10, dtype=np.float64)
+    wspd = np.sqrt(u_wind*u_wind + v_wind*v_wind)
+    wdir = np.mod(270.0 - np.arctan2(v_wind, u_wind) * (180.0/wrf.Constants.PI), 360.0)
+    return np.stack([wspd, wdir]).astype(np.asarray(u10).dtype, copy=False)
+
+
+def map_rotation(ncfile):
+    """map_rotation: (cen_lon, cone) used by get_uvmet10 to rotate the wind
+
+    Input:
+        ncfile (netCDF4 Dataset or WrfoutSet) model output
+    Output:
+        (tuple) None when the projection needs no rotation (Mercator, Lat/Lon)
+    """
+    map_proj = ncfile.getncattr("MAP_PROJ")
+    if map_proj not in (1, 2):
+        return None
+
+    radians_per_degree = wrf.Constants.PI/180.0
+    true_lat1 = ncfile.getncattr("TRUELAT1")
+    true_lat2 = ncfile.getncattr("TRUELAT2")
+    if "STAND_LON" in ncfile.ncattrs():
+        cen_lon = ncfile.getncattr("STAND_LON")
+    else:
+        cen_lon = ncfile.getncattr("CEN_LON")
+
+    #1 - Lambert    2 - Polar Stereographic
+    if map_proj == 1:
+        if fabs(true_lat1 - true_lat2) > 0.1 and fabs(true_lat2 - 90.) > 0.1:
+            cone = (log(cos(true_lat1*radians_per_degree)) -\
+                    log(cos(true_lat2*radians_per_degree)))
+            cone = (cone /\
+                    (log(tan((45.-fabs(true_lat1/2.))*radians_per_degree)) -\
+                     log(tan((45.-fabs(true_lat2/2.))*radians_per_degree))))
+        else:
+            cone = sin(fabs(true_lat1)*radians_per_degree)
+    else:
+        cone = 1
+
+    return cen_lon, cone
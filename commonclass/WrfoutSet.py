@@ -0,0 +1,170 @@
+"""Copyright (C) 2018-Present E. Allen, D. Moore, D. Veron - University of Delaware"""
+#
+# You may use, distribute and modify this code under the
+# terms of the GNU Lesser General Public License v3.0 license.
+#
+# https://www.gnu.org/licenses/lgpl-3.0.en.html
+#
+# Imports
+from __future__ import print_function
+import sys
+from collections import OrderedDict, namedtuple
+import numpy as np
+from netCDF4 import Dataset, chartostring
+
+Dimension = namedtuple("Dimension", ["name", "size"])
+
+class WrfoutSet:
+    """
+    Several wrfout files of one model run (e.g. frames_per_outfile=1 or daily files)
+    read as one file with a single Time axis.
+
+    Only the Times of each file are read when the set is created. The files are
+    opened when a time step in them is read, and at most max_open of them are kept
+    open. Iterating over the set gives the files in time order (opened again when
+    they are used, see _File), so it can be passed to wrf-python like a list of files.
+
+    Input:
+        filenames (list) wrfout files (sorted by name - WRF names them by start time)
+        max_open (int) number of files kept open by reads through variables
+    Output:
+        class object
+    """
+    def __init__(self, filenames, max_open=8):
+        self.filenames = sorted(filenames)
+        self.max_open = max_open
+        self.handles = OrderedDict()
+
+        #Index the Time axis: time step -> (file, time step in the file)
+        times, file_index, local_index = [], [], []
+        for ifile, filename in enumerate(self.filenames):
+            with Dataset(filename) as ncfile:
+                #"2014-06-03_12:00:00" -> datetime64
+                file_times = np.char.replace(chartostring(ncfile.variables["Times"][:]),\
+                                             "_", "T").astype("datetime64[us]")
+                if ifile == 0:
+                    self.dimensions = {name: Dimension(name, dim.size) for name, dim in\
+                                       ncfile.dimensions.items()}
+                    self.time_vars = {name for name, var in ncfile.variables.items()\
+                                      if var.dimensions[:1] == ("Time",)}
+            times.append(file_times)
+            file_index.extend([ifile] * len(file_times))
+            local_index.extend(range(len(file_times)))
+
+        self.times = np.concatenate(times)
+        if np.any(np.diff(self.times) <= np.timedelta64(0)):
+            sys.exit("WRF FILES OVERLAP OR ARE OUT OF ORDER: "+str(self.filenames))
+
+        self.file_index = np.array(file_index)
+        self.local_index = np.array(local_index)
+        self.dimensions["Time"] = Dimension("Time", len(self.times))
+        self.variables = _Variables(self)
+
+    def __len__(self):
+        return len(self.filenames)
+
+    def __iter__(self):
+        for ifile in range(len(self.filenames)):
+            yield _File(self, ifile)
+
+    def dataset(self, ifile, evict=True):
+        """dataset: Open file ifile (or reuse it if it is already open)
+
+        Input:
+            ifile (int) index into filenames
+            evict (bool) close the least recently used files beyond max_open
+        Output:
+            (netCDF4 Dataset)
+        """
+        if ifile in self.handles:
+            self.handles.move_to_end(ifile)
+        else:
+            self.handles[ifile] = Dataset(self.filenames[ifile])
+
+        handle = self.handles[ifile]
+        while evict and len(self.handles) > self.max_open:
+            self.handles.popitem(last=False)[1].close()
+        return handle
+
+    def read(self, name, key):
+        """read: variable[key] across the files, with key[0] indexing the combined Time axis
+
+        Only the files holding the requested time steps are read.
+
+        Input:
+            name (string) variable name
+            key (tuple) index (time, ...)
+        Output:
+            (masked array)
+        """
+        if not isinstance(key, tuple):
+            key = (key,)
+        if name not in self.time_vars:
+            return self.dataset(0).variables[name][key]
+
+        steps = np.arange(len(self.times))[key[0]]
+        if np.ndim(steps) == 0:
+            return self.dataset(self.file_index[steps]).variables[name]\
+                       [(self.local_index[steps],) + key[1:]]
+
+        pieces = []
+        files = self.file_index[steps]
+        for ifile in OrderedDict.fromkeys(files.tolist()):
+            local = self.local_index[steps[files == ifile]]
+            if np.all(np.diff(local) == 1):
+                local = slice(local[0], local[-1]+1)
+            pieces.append(self.dataset(ifile).variables[name][(local,) + key[1:]])
+
+        if not pieces:
+            return self.dataset(0).variables[name][(slice(0, 0),) + key[1:]]
+        return np.ma.concatenate(pieces)
+
+    def ncattrs(self):
+        """ncattrs: Global attribute names (of the first file)"""
+        return self.dataset(0).ncattrs()
+
+    def getncattr(self, name):
+        """getncattr: Global attribute (of the first file, as wrf-python reads it)"""
+        return self.dataset(0).getncattr(name)
+
+    def close(self):
+        """close: Close the open files"""
+        while self.handles:
+            self.handles.popitem()[1].close()
+
+
+class _File:
+    """
+    One file of a WrfoutSet as wrf-python sees it. Every attribute comes from the
+    netCDF4 Dataset, which is opened (again) through WrfoutSet.dataset when it is
+    used, so iterating over the set - also all at once, as list(wrfseq) in wrf-python
+    does - keeps at most max_open files open.
+    """
+    def __init__(self, wrfout_set, ifile):
+        self.wrfout_set = wrfout_set
+        self.ifile = ifile
+
+    def __getattr__(self, name):
+        return getattr(self.wrfout_set.dataset(self.ifile), name)
+
+
+class _Variables:
+    """ncfile.variables[name][key] for a WrfoutSet"""
+    def __init__(self, wrfout_set):
+        self.wrfout_set = wrfout_set
+
+    def __getitem__(self, name):
+        return _Variable(self.wrfout_set, name)
+
+    def __contains__(self, name):
+        return name in self.wrfout_set.dataset(0).variables
+
+
+class _Variable:
+    """One variable of a WrfoutSet, read when it is indexed"""
+    def __init__(self, wrfout_set, name):
+        self.wrfout_set = wrfout_set
+        self.name = name
+
+    def __getitem__(self, key):
+        return self.wrfout_set.read(self.name, key)
@@ -10,8 +10,8 @@ import sys
 import numpy as np
 import pandas as pd
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from src_sfc_stats.get_land_value import get_land_value
-from src_sfc_stats.get_values_loc import get_values_loc
+import wrf
+from src_sfc_stats.get_values_loc import get_values_stencil
 from commonclass.ModelData import ModelData
 #LWSD1  = -75.11917, 38.78278
 
@@ -74,14 +74,15 @@ wrf_substeps = 1
 
 # For each WRF domain in analysis get that data file and read it. If Empty->EXIT
 for ind_var in independent_var:
-    #Get landmask values
-    wrf_data = ModelData(case=case_time, version=ind_var, var=variables[0],\
+    #Only the 3x3 grid points around the station are read (not the whole domain)
+    wrf_data = ModelData(case=case_time, version=ind_var, var=None,\
              domain=domain, path=data_directory)
-    wrf_data.get_landmask()
+    x_y = wrf.ll_to_xy(wrf_data.ncfile, loc_lat, loc_lon, meta=False)
+    steps, station = wrf_data.get_station_data([(int(x_y[1]), int(x_y[0]))],\
+                                               variables + ["LANDMASK"])
     lst = np.zeros((43, len(variables)))
     for i, var in enumerate(variables):
-        wrf_data.get_wrf_data(var)
-        for j in range(0, len(wrf_data.wrf_dt), wrf_substeps):
+        for j in range(0, len(steps), wrf_substeps):
             #Some type of work around...
             #if "PRES" in var.upper():
             #    wrf.g_slp.get_slp(cls.ncfile, timeidx=wrf.ALL_TIMES,\
@@ -89,14 +90,10 @@ for ind_var in independent_var:
             #                            meta=False, _key=None, units='Pa')
             
             # When evaluating with an average only use same land-type as station.
-            land_val = get_land_value(wrf_data.ncfile,\
-                                  wrf_data.landvalues[j, :, :],\
-                                  loc_lat, loc_lon)
+            landmask = station["LANDMASK"][j, 0]
+            land_val = landmask[1, 1]
             #Get the WRF variable's values for this time and location
-            trim_wrf_var = get_values_loc(wrf_data.ncfile,\
-                                  wrf_data.wrf_var[j, :, :],\
-                                  wrf_data.landvalues[j, :, :], land_val, \
-                                  loc_lat, loc_lon,\
+            trim_wrf_var = get_values_stencil(station[var][j, 0], landmask, land_val,\
                                   analysis_type=False)
             if var in ["SST", 'Air_Temperature (K)', 'Dewpoint_Temperature (K)']:
                 lst[j, i] = trim_wrf_var - 273.15
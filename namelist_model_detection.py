@@ -15,6 +15,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from commonclass.AnalysisGrid import AnalysisGrid
 from commonclass.DetectionInfo import DetectionInfo
 from src_model.driver import driver
+from src_model.parallel_driver import parallel_driver
+from src_model.sweep import sweep_driver
 
 if os.environ.get('DISPLAY', '') == '':
     print('no display found. Using non-interactive Agg backend')
@@ -52,6 +54,27 @@ def main():
     variable = "Potential Temperature"          # This shouldn't change
     domain = 3                                  # Int value 3 --> "03"
     save_results = True                        # Should be True
+    batch_mode = False                          # True: all time steps at once (more memory)
+    lazy_read = True                            # Read only the analysis level/box as needed
+    output_format = "csv"                       # 2D theta/front output: "csv" or "netcdf"
+    processes = 1                               # >1 runs (case, version) pairs in parallel
+    split_timesteps = 1                         # Work items per (case, version) when parallel
+    plot_processes = 0                          # >0 saves the plots in background processes
+    plot_max_pending = 8                        # Most figures waiting for those processes
+    tracking = False                            # Search near the previous front, save speeds
+    track_band = 10                             # Columns searched either side when tracking
+    profile = False                             # Time/memory of each stage -> PROFILE_*.csv
+    resume = False                              # Skip finished runs, continue unfinished ones
+    levels = None                               # e.g. range(1, 8): front at each level + depth
+    precision = "float64"                       # "float32" halves memory (checked vs float64)
+    #Keep variables calculated by wrf-python (eager reads) between runs (None = off)
+    #e.g. os.path.join(os.getcwd(), 'Data', 'wrf_cache')
+    cache_directory = None
+    cache_max_gb = 20.
+    #Tune the grid instead: statistics for every combination (None = normal detection)
+    #e.g. {"cell_size": [1, 2, 3], "gradient_distance": [6, 10], "threshold": [0.1, 0.125],
+    #      "filter_area": [250, 500]}
+    sweep = None
     namelist_wps_file = os.path.join(os.getcwd(), 'namelist_FRONT.wps') #Set valid path
 
 # =============================================================================
@@ -80,7 +103,13 @@ def main():
 # =============================================================================
     # First Location of model data (all EXCEPT BUOY and BUOY_SST runs)
     detect = DetectionInfo(cases_times=casestudy_time, case_versions=independent_var,\
-                           variable=variable, domain_number=domain, save_results=save_results)
+                           variable=variable, domain_number=domain, save_results=save_results,\
+                           batch_mode=batch_mode, lazy_read=lazy_read,\
+                           output_format=output_format, plot_processes=plot_processes,\
+                           plot_max_pending=plot_max_pending,\
+                           tracking=tracking, track_band=track_band, profile=profile,\
+                           resume=resume, levels=levels, precision=precision,\
+                           cache_directory=cache_directory, cache_max_gb=cache_max_gb)
     detect.set_data_dir(data_directory)
     detect.set_namelistwps(namelist_wps_file)
 
@@ -95,7 +124,12 @@ def main():
 # =============================================================================
 #   Start detecting fronts
 # =============================================================================
-    driver(grid, detect)
+    if sweep is not None:
+        sweep_driver(grid, detect, sweep)
+    elif processes > 1:
+        parallel_driver(grid, detect, processes=processes, split_timesteps=split_timesteps)
+    else:
+        driver(grid, detect)
 
 # =============================================================================
 # =============================================================================
@@ -128,7 +162,12 @@ def main():
 # =============================================================================
 #   Start detecting fronts
 # =============================================================================
-    driver(grid, detect)
+    if sweep is not None:
+        sweep_driver(grid, detect, sweep)
+    elif processes > 1:
+        parallel_driver(grid, detect, processes=processes, split_timesteps=split_timesteps)
+    else:
+        driver(grid, detect)
 
 if __name__ == '__main__':
     main()
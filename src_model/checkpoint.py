@@ -0,0 +1,196 @@
+"""Copyright (C) 2018-Present E. Allen, D. Moore, D. Veron - University of Delaware"""
+#
+# You may use, distribute and modify this code under the
+# terms of the GNU Lesser General Public License v3.0 license.
+#
+# https://www.gnu.org/licenses/lgpl-3.0.en.html
+#
+# Imports
+from __future__ import print_function
+import os
+import json
+from datetime import datetime
+import numpy as np
+
+TIME_FORMAT = "%m%d%Y_%H%M"
+
+def run_name(case_time, version):
+    """run_name: <case>_<version> part of the output file names"""
+    return case_time.replace("-", "_")+"_"+version
+
+
+def manifest_name(datapath, case_time, version):
+    """manifest_name: completion manifest of one case/version (next to the SBF csv)"""
+    return os.path.join(datapath, "COMPLETE_"+run_name(case_time, version)+".json")
+
+
+def checkpoint_name(datapath, case_time, version):
+    """checkpoint_name: progress file of one case/version while it is running"""
+    return os.path.join(datapath, "CHECKPOINT_"+run_name(case_time, version)+".npz")
+
+
+def run_settings(grid, detection_info):
+    """run_settings: Settings that change the detected fronts (kept with the results)
+
+    A manifest or checkpoint written with other settings is not used.
+
+    Input:
+        grid (class) instance of AnalysisGrid
+        detection_info (class) instance of DetectionInfo
+    Output:
+        (dict) as it reads back from json
+    """
+    levels = detection_info.levels
+    settings = {"grid": list(grid.get_config()),\
+                "variable": detection_info.variable,\
+                "domain": detection_info.domain,\
+                "output_format": detection_info.output_format,\
+                "tracking": detection_info.tracking,\
+                "track_band": detection_info.track_band,\
+                "levels": None if levels is None else [int(level) for level in levels],\
+                "precision": detection_info.precision}
+    return json.loads(json.dumps(settings))
+
+
+def write_manifest(datapath, case_time, version, wrf_dt, outputs, settings):
+    """write_manifest: Mark a case/version as complete and remove its checkpoint
+
+    Input:
+        datapath (string) output directory of the model run
+        case_time (string) formatted case time
+        version (string) Sensitivity test version
+        wrf_dt (list) datetime objects of the model time steps
+        outputs (list) file names (in datapath) written for the run
+        settings (dict) run_settings of the run
+    Output:
+        json file COMPLETE_<case>_<version>.json
+    """
+    manifest = {"case_time": case_time,\
+                "version": version,\
+                "settings": settings,\
+                "time_steps": len(wrf_dt),\
+                "first_time": wrf_dt[0].strftime(TIME_FORMAT),\
+                "last_time": wrf_dt[-1].strftime(TIME_FORMAT),\
+                "outputs": [os.path.basename(output) for output in outputs],\
+                "completed": datetime.now().isoformat()}
+
+    filename = manifest_name(datapath, case_time, version)
+    with open(filename+".tmp", "w") as outfile:
+        json.dump(manifest, outfile, indent=1)
+    os.replace(filename+".tmp", filename)
+
+    checkpoint = checkpoint_name(datapath, case_time, version)
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+
+def is_complete(datapath, case_time, version, wrf_dt, settings):
+    """is_complete: True if the manifest and outputs of this case/version match the model run
+
+    The manifest must have the same settings and list the same number of time steps
+    (and first/last time) as wrf_dt, and every output it lists must exist. The SBF
+    file must have a column for every time step.
+
+    Input:
+        datapath (string) output directory of the model run
+        case_time (string) formatted case time
+        version (string) Sensitivity test version
+        wrf_dt (list) datetime objects of the model time steps
+        settings (dict) run_settings of this run
+    Output:
+        (bool)
+    """
+    filename = manifest_name(datapath, case_time, version)
+    if not os.path.exists(filename):
+        return False
+
+    try:
+        with open(filename) as infile:
+            manifest = json.load(infile)
+    except ValueError:
+        return False
+
+    if manifest.get("settings") != settings:
+        print(version, ":: Results were made with other settings. Running again...")
+        return False
+
+    if manifest.get("time_steps") != len(wrf_dt) or\
+       manifest.get("first_time") != wrf_dt[0].strftime(TIME_FORMAT) or\
+       manifest.get("last_time") != wrf_dt[-1].strftime(TIME_FORMAT):
+        return False
+
+    for output in manifest.get("outputs", []):
+        if not os.path.exists(os.path.join(datapath, output)):
+            return False
+        if output.startswith("SBF_"):
+            with open(os.path.join(datapath, output)) as infile:
+                if len(infile.readline().split(",")) != len(wrf_dt)+1:
+                    return False
+
+    return True
+
+
+def save_checkpoint(wrf, master_list, header, settings, tracker=None):
+    """save_checkpoint: Save the time steps finished so far (after each time step)
+
+    Input:
+        wrf (class) ModelData (time_idx = last finished time step)
+        master_list (2D array) latitude column then longitudes for each time step
+        header (list) column names of the finished time steps
+        settings (dict) run_settings of the run
+        tracker (class) FrontTracker (None when not tracking)
+    Output:
+        npz file CHECKPOINT_<case>_<version>.npz
+    """
+    state = {"master_list": master_list, "header": np.array(header),\
+             "time_steps": len(wrf.wrf_dt), "settings": np.array(json.dumps(settings))}
+    if tracker is not None:
+        state["prior_idx"] = tracker.prior_idx
+        state["prior_step"] = -1 if tracker.prior_time is None else\
+                              wrf.wrf_dt.index(tracker.prior_time)
+        state["speeds"] = tracker.speed_table()
+
+    filename = checkpoint_name(wrf.datapath, wrf.case_time, wrf.version)
+    with open(filename+".tmp", "wb") as outfile:
+        np.savez(outfile, **state)
+    os.replace(filename+".tmp", filename)
+
+
+def load_checkpoint(wrf, settings, tracker=None):
+    """load_checkpoint: Progress of an unfinished case/version
+
+    The checkpoint is ignored if it does not match the model run (settings, number
+    of time steps or the times of the finished time steps).
+
+    Input:
+        wrf (class) ModelData
+        settings (dict) run_settings of this run
+        tracker (class) FrontTracker - restored to the last finished time step
+    Output:
+        start (int) first time step still to run (0 = start over)
+        master_list (2D array) latitude column then longitudes (None when starting over)
+        header (list) column names of the finished time steps
+    """
+    filename = checkpoint_name(wrf.datapath, wrf.case_time, wrf.version)
+    if not os.path.exists(filename):
+        return 0, None, ["LATITUDE"]
+
+    with np.load(filename) as state:
+        header = [str(name) for name in state["header"]]
+        times = [time.strftime(TIME_FORMAT) for time in wrf.wrf_dt[:len(header)-1]]
+        if "settings" not in state or json.loads(str(state["settings"])) != settings:
+            print(wrf.version, ":: Checkpoint was made with other settings. Starting over...")
+            return 0, None, ["LATITUDE"]
+
+        if int(state["time_steps"]) != len(wrf.wrf_dt) or header[1:] != times or\
+           (tracker is not None) != ("prior_idx" in state):
+            return 0, None, ["LATITUDE"]
+
+        master_list = state["master_list"]
+        if tracker is not None:
+            prior_step = int(state["prior_step"])
+            tracker.restore(state["prior_idx"],\
+                            wrf.wrf_dt[prior_step] if prior_step >= 0 else None,\
+                            list(state["speeds"].T))
+
+    return len(header)-1, master_list, header
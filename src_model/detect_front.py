@@ -9,47 +9,131 @@
 from __future__ import print_function
 import numpy as np
 
-def detect_front(masked_array, grid_in, wrf):
+def leading_edge(data, grid_in):
+    """leading_edge: Column index of the leading edge of the front in every row
+
+    A point qualifies if it is above the threshold and has a point above the
+    threshold at 1/2 the gradient distance on either side. The strongest qualifying
+    point in the row is the leading edge; ties go to the eastern-most point.
+
+    Input:
+        data (array or masked array) Front Threshold Values (..., south_north, west_east)
+        grid_in (class) AnalysisGrid
+    Output:
+        foundidx (array) column index of the front for each row in the analysis window
+        found (array) boolean, True where a front point was found in the row
+    """
+    spacer = int(grid_in.gradient_distance*0.5)
+    eastern_point = (grid_in.east_end-grid_in.gradient_distance)-spacer
+    #West = low numbers, East = High Numbers. Columns are searched east-to-west.
+    cols = np.arange(eastern_point, grid_in.west_start+spacer, -1)
+
+    values = np.ma.filled(np.ma.asarray(data)[..., grid_in.south_start:grid_in.north_end, :],\
+                          np.nan)
+    #Window too narrow for the gradient distance - nothing can qualify
+    if cols.size == 0:
+        return _not_found(values.shape[:-1], grid_in)
+    foundidx, found = _search_columns(values, values > grid_in.threshold, cols, spacer)
+
+    return foundidx, found
+
+
+def leading_edge_tracked(data, grid_in, prior_idx, band):
+    """leading_edge_tracked: leading_edge for one time step, searching near the previous front
+
+    Each row is first searched within band columns of its front at the previous time
+    step (prior_idx). Rows without a prior, or where nothing qualifies in the band,
+    are searched across the full analysis window as in leading_edge.
+
+    Input:
+        data (2D array or masked array) Front Threshold Values (south_north, west_east)
+        grid_in (class) AnalysisGrid
+        prior_idx (array) column index of the previous front in each row (-1 = none)
+        band (int) number of columns searched on either side of prior_idx
+    Output:
+        foundidx (array) column index of the front for each row in the analysis window
+        found (array) boolean, True where a front point was found in the row
+        tracked (array) boolean, True where the front point was found in the band
+    """
+    spacer = int(grid_in.gradient_distance*0.5)
+    eastern_point = (grid_in.east_end-grid_in.gradient_distance)-spacer
+    cols = np.arange(eastern_point, grid_in.west_start+spacer, -1)
+
+    values = np.ma.filled(np.ma.asarray(data)[grid_in.south_start:grid_in.north_end, :], np.nan)
+    if cols.size == 0:
+        foundidx, found = _not_found(values.shape[:-1], grid_in)
+        return foundidx, found, found.copy()
+    above = values > grid_in.threshold
+
+    #Band around the prior, east-to-west and kept inside the analysis window
+    prior_idx = np.asarray(prior_idx)
+    band_cols = np.clip(prior_idx[:, None] + np.arange(band, -band-1, -1), cols[-1], cols[0])
+    foundidx, tracked = _search_columns(values, above, band_cols, spacer)
+    tracked &= prior_idx >= 0
+    found = tracked.copy()
+
+    #Full scan where the band came up empty
+    retry = ~tracked
+    if retry.any():
+        foundidx[retry], found[retry] = _search_columns(values[retry], above[retry], cols, spacer)
+
+    return foundidx, found, tracked
+
+
+def _not_found(shape, grid_in):
+    """_not_found: No front in any row (foundidx = west_start, found = False)"""
+    return np.full(shape, grid_in.west_start, dtype=int), np.zeros(shape, dtype=bool)
+
+
+def _search_columns(values, above, cols, spacer):
+    """_search_columns: Strongest qualifying point of each row among cols
+
+    Input:
+        values (array) Front Threshold Values (..., rows, west_east)
+        above (array) boolean, values above the threshold
+        cols (array) columns to search, east-to-west (shared, or one set per row)
+        spacer (int) 1/2 the gradient distance
+    Output:
+        foundidx (array) column index of the strongest qualifying point
+        found (array) boolean, True where a point qualified
+    """
+    cols = np.broadcast_to(cols, values.shape[:-1]+cols.shape[-1:])
+
+    #Largest gradient value, above threshold (and zero) with a valid point above
+    #the threshold at 1/2 the gradient distance on either side.
+    qualify = np.take_along_axis(above, cols, axis=-1) &\
+              (np.take_along_axis(values, cols, axis=-1) > 0.0) &\
+              (np.take_along_axis(above, cols-spacer, axis=-1) |\
+               np.take_along_axis(above, cols+spacer, axis=-1))
+    candidates = np.where(qualify, np.take_along_axis(values, cols, axis=-1), -np.inf)
+
+    #argmax returns the first maximum, which is the eastern-most point
+    best = np.argmax(candidates, axis=-1)
+    foundidx = np.take_along_axis(cols, best[..., None], axis=-1)[..., 0]
+
+    return foundidx, qualify.any(axis=-1)
+
+
+def detect_front(masked_array, grid_in, wrf, tracker=None):
     """detect_front: Detect Leading Edge of Horizontal Front (Potential Temperature Gradient)
 
     Input:
         masked_array (masked array) Front Threshold Values
         grid_in (class) AnalysisGrid
         wrf (class) ModelData
+        tracker (class) FrontTracker - search near the previous front first (None = full scan)
 
     Output:
         sbflon (list) Longitudes of front locations
         sbflat (list) Latitude of front locations
     """
-    sbflon = []
-    sbflat = []
-    spacer = int(grid_in.gradient_distance*0.5)
-    eastern_point = (grid_in.east_end-grid_in.gradient_distance)-spacer
-    for row in range(grid_in.south_start, grid_in.north_end):
-        if not masked_array[row, :].mask.all():
-            maxchange = 0.0
-            #West = low numbers, East = High Numbers # -1 is to ensure it's the 0 idx
-            #for idx in range(grid_in.west_start, grid_in.east_end-grid_in.gradient_distance):
-            for idx in range(eastern_point, grid_in.west_start+spacer, -1):
-                #If it is the largest gradient value, above threshold
-                # and has a valid point above the threshold at 1/2 the
-                # gradient distance on either side.
-                if masked_array[row, idx] > maxchange\
-                        and masked_array[row, idx] > grid_in.threshold\
-                        and (masked_array[row, idx-spacer] > grid_in.threshold or\
-                             masked_array[row, idx+spacer] > grid_in.threshold):
-
-                    maxchange = masked_array[row, idx]
-                    foundidx = idx
-
-            if maxchange > 0:
-                sbflon.append(wrf.lons[row, foundidx])
-                sbflat.append(wrf.lats[row, foundidx])
-            else:
-                sbflon.append(np.nan)
-                sbflat.append(wrf.lats[row, 0])
-        else:
-            sbflon.append(np.nan)
-            sbflat.append(wrf.lats[row, 0])
-
-    return sbflon, sbflat
+    rows = np.arange(grid_in.south_start, grid_in.north_end)
+    if tracker is None:
+        foundidx, found = leading_edge(masked_array, grid_in)
+    else:
+        foundidx, found = tracker.locate(masked_array, grid_in)
+
+    sbflon = np.where(found, wrf.lons[rows, foundidx], np.nan)
+    sbflat = np.where(found, wrf.lats[rows, foundidx], wrf.lats[rows, 0])
+
+    return list(sbflon), list(sbflat)
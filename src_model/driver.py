@@ -9,12 +9,22 @@
 from __future__ import print_function
 import os
 import sys
-#import time
 import numpy as np
 import pandas as pd
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from src_model.find_front import find_front
+from src_model.find_front_batch import find_front_batch
+from src_model.find_front_levels import find_front_levels, save_front_levels
+from src_model.front_store import FrontStore, front_store_name
+from src_model.plot_queue import PlotQueue
+from src_model.front_tracker import FrontTracker
+from src_model.profiler import StageProfiler, stage
+from src_model.workspace import Workspace
+from src_model.precision import compare_precision
+from src_model.checkpoint import is_complete, load_checkpoint, save_checkpoint, write_manifest,\
+                                 run_settings
 from commonclass.ModelData import ModelData
+from commonclass.DiagnosticCache import open_cache
 
 def driver(grid, detection_info):
     """driver: Run the detection algorithm by looping through cases/versions and analyzing
@@ -30,59 +40,281 @@ def driver(grid, detection_info):
 
     detection_info.print_info()
 
-    for case in detection_info.casestudy_times:
-        for ivar in detection_info.independent_variables:
+    #Kept with the results - resume only reuses results made with the same settings
+    settings = run_settings(grid, detection_info)
 
-            wrf_data = ModelData(case=case, version=ivar, var=detection_info.variable,\
-                                 domain=detection_info.domain,\
-                                 path=detection_info.data_directory)
+    #Plots are saved in the background while the next time steps are detected
+    plot_queue = None
+    if detection_info.plot_processes > 0 and detection_info.save_results:
+        plot_queue = PlotQueue(processes=detection_info.plot_processes,\
+                               max_pending=detection_info.plot_max_pending)
 
-            wrf_data.set_datapath(os.path.join(os.getcwd(), 'Data', "Model_Data", "Fronts",\
-                                    wrf_data.case_time.replace("-", "_"), wrf_data.version))
+    #Time and peak memory of each stage
+    profiler = None
+    if detection_info.profile:
+        profiler = StageProfiler()
 
-            wrf_data.set_mappath(os.path.join(os.getcwd(), 'Plots', 'ModelFronts',\
-                                   wrf_data.case_time.replace("-", "_"), wrf_data.version))
+    wrf_data = None
+    try:
+        for case in detection_info.casestudy_times:
+            for ivar in detection_info.independent_variables:
 
-            wrf_data.set_namelistwps(detection_info.wpsfile)
-            wrf_data.set_save(detection_info.save_results)
+                if profiler is not None:
+                    profiler.set_run(case, ivar)
 
-            #FOR DEBUG ONLY
-            #wrf_data.print_info()
+                with stage(profiler, "open"):
+                    wrf_data = open_model_run(case, ivar, detection_info, grid)
 
-            #Loop through times in the model output
-            first_df = True
-            for time_step in range(len(wrf_data.wrf_dt)):
-                #start_time = time.time()
-                #Update timestep
-                wrf_data.set_timestep(time_step)
+                #Finished in an earlier run (with the same settings)
+                if detection_info.resume and is_complete(wrf_data.datapath, wrf_data.case_time,\
+                                                         wrf_data.version, wrf_data.wrf_dt,\
+                                                         settings):
+                    print(ivar, ":: Already complete. Skipping...")
+                    continue
 
-                #Find Front - Single Time Step
-                out_lon, out_lat, front_info = find_front(wrf_data, grid)
+                wrf_data.set_plot_queue(plot_queue)
+                wrf_data.set_profiler(profiler)
+                tracker = open_tracker(detection_info, grid)
 
-                #Store data for one time step, each time step
-                if first_df:
-                    master_list = np.zeros((len(out_lat), len(wrf_data.wrf_dt)+1))
-                    header = ["LATITUDE",\
-                              wrf_data.wrf_dt[wrf_data.time_idx].strftime("%m%d%Y_%H%M")]
-                    master_list[:, 0] = out_lat
-                    master_list[:, time_step+1] = out_lon
-                    first_df = False
+                #FOR DEBUG ONLY
+                #wrf_data.print_info()
+
+                #All times in the model output at once
+                if detection_info.batch_mode:
+                    open_store(wrf_data, detection_info, grid)
+                    master_list, header, all_front_info = find_front_batch(wrf_data, grid, tracker)
+                    for time_step, front_info in enumerate(all_front_info):
+                        print_front_info(ivar, time_step, front_info)
+                    sys.stdout.flush()
+
+                #Loop through times in the model output
                 else:
-                    header.append(wrf_data.wrf_dt[wrf_data.time_idx].strftime("%m%d%Y_%H%M"))
-                    master_list[:, time_step+1] = out_lon
+                    #Pick up after the last finished time step of an earlier run
+                    start, master_list, header = 0, None, ["LATITUDE"]
+                    if detection_info.resume:
+                        start, master_list, header = load_checkpoint(wrf_data, settings, tracker)
+                        if start > 0:
+                            print(ivar, ":: Resuming at time step", start)
+                    open_store(wrf_data, detection_info, grid, append=start > 0)
+
+                    for time_step in range(start, len(wrf_data.wrf_dt)):
+                        #Update timestep
+                        wrf_data.set_timestep(time_step)
+
+                        #Find Front - Single Time Step
+                        out_lon, out_lat, front_info = find_front(wrf_data, grid, tracker=tracker)
+
+                        #Store data for one time step, each time step
+                        if master_list is None:
+                            master_list = np.zeros((len(out_lat), len(wrf_data.wrf_dt)+1))
+                            master_list[:, 0] = out_lat
+                        header.append(wrf_data.wrf_dt[wrf_data.time_idx].strftime("%m%d%Y_%H%M"))
+                        master_list[:, time_step+1] = out_lon
+
+                        if detection_info.save_results and detection_info.resume:
+                            save_checkpoint(wrf_data, master_list, header, settings, tracker)
+
+                        print_front_info(ivar, time_step, front_info)
+                        sys.stdout.flush()
+
+                #Front at several model levels
+                level_outputs = analyze_levels(wrf_data, grid, detection_info)
+
+                #Save data
+                with stage(profiler, "save"):
+                    if wrf_data.store is not None:
+                        wrf_data.store.close()
 
-                #end_time = time.time()
-                print(ivar, time_step, ":: Front Found: ", front_info[0], "  |||  Percentage: ",\
-                      front_info[1], "  |||  Length: ", front_info[2])
-                      #, "  |||  ", end_time - start_time)
-                sys.stdout.flush()
+                    if detection_info.save_results:
+                        outputs = [save_fronts(wrf_data.datapath, wrf_data.case_time,\
+                                               wrf_data.version, master_list, header)]
+                        if tracker is not None:
+                            outputs.append(save_front_speeds(wrf_data.datapath, wrf_data.case_time,\
+                                                             wrf_data.version, master_list[:, 0],\
+                                                             tracker.speed_table(), header))
+                        if wrf_data.store is not None:
+                            outputs.append(wrf_data.store.filename)
+                        outputs.extend(level_outputs)
+                        write_manifest(wrf_data.datapath, wrf_data.case_time, wrf_data.version,\
+                                       wrf_data.wrf_dt, outputs, settings)
 
-            sbf_df = pd.DataFrame(master_list, columns=header)
+                #Wait for this version's plots before moving on
+                if plot_queue is not None:
+                    with stage(profiler, "plot"):
+                        plot_queue.flush()
 
-            #Save data
-            if detection_info.save_results:
-                outstring = os.path.join(wrf_data.datapath, "SBF_"+\
-                           wrf_data.case_time.replace("-", "_")+\
-                           "_"+wrf_data.version+".csv")
+                if profiler is not None and detection_info.save_results:
+                    profiler.save(wrf_data.datapath, wrf_data.case_time)
+
+    except BaseException:
+        #Detection failed - do not wait for the figures still queued
+        if plot_queue is not None:
+            plot_queue.terminate()
+        raise
+    else:
+        if plot_queue is not None:
+            plot_queue.close()
+        if profiler is not None:
+            profiler.print_summary()
+    finally:
+        #A run stopped by an error - keep the time steps already written to its store
+        if wrf_data is not None and wrf_data.store is not None:
+            wrf_data.store.close()
+        if profiler is not None:
+            profiler.close()
+
+
+def open_model_run(case, ivar, detection_info, grid):
+    """open_model_run: Read in one model run and set where its results are stored
+
+    Input:
+        case (string) case time
+        ivar (string) Sensitivity test version
+        detection_info (class) instance of DetectionInfo
+        grid (class) instance of AnalysisGrid
+    Output:
+        wrf_data (class) ModelData
+    """
+    wrf_data = ModelData(case=case, version=ivar, var=detection_info.variable,\
+                         domain=detection_info.domain,\
+                         path=detection_info.data_directory,\
+                         lazy=detection_info.lazy_read,\
+                         cache=open_cache(detection_info.cache_directory,\
+                                          detection_info.cache_max_gb))
 
-                sbf_df.to_csv(outstring, index=False)
+    wrf_data.set_datapath(os.path.join(os.getcwd(), 'Data', "Model_Data", "Fronts",\
+                            wrf_data.case_time.replace("-", "_"), wrf_data.version))
+
+    wrf_data.set_mappath(os.path.join(os.getcwd(), 'Plots', 'ModelFronts',\
+                           wrf_data.case_time.replace("-", "_"), wrf_data.version))
+
+    wrf_data.set_namelistwps(detection_info.wpsfile)
+    wrf_data.set_save(detection_info.save_results)
+
+    if detection_info.precision == "float32":
+        open_workspace(wrf_data, grid)
+
+    return wrf_data
+
+
+def open_workspace(wrf_data, grid):
+    """open_workspace: Run the detection stages in float32 with reused work arrays
+
+    The first time step is run through the float64 and the float32 stages and the
+    difference is printed, with a warning if it is larger than the tolerance.
+
+    Input:
+        wrf_data (class) ModelData
+        grid (class) instance of AnalysisGrid
+    """
+    work = Workspace(np.float32)
+
+    wrf_data.set_timestep(0)
+    theta = np.asarray(wrf_data.get_level_data(grid.level, grid.get_read_window()),\
+                       dtype=np.float64)
+    max_diff, rows_diff, within = compare_precision(theta, grid, work)
+    print(wrf_data.version, ":: Float32 check - Max Frontal Strength Difference: ", max_diff,\
+          "  |||  Rows With a Different Front: ", rows_diff)
+    if not within:
+        print("WARNING: float32 frontal strength is outside of the tolerance."\
+              " Consider precision = \"float64\"")
+
+    wrf_data.set_precision(np.float32)
+    wrf_data.set_workspace(work)
+
+
+def open_store(wrf_data, detection_info, grid, append=False):
+    """open_store: Open the netcdf store of the 2D fields (output_format = "netcdf")
+
+    Input:
+        wrf_data (class) ModelData
+        detection_info (class) instance of DetectionInfo
+        grid (class) instance of AnalysisGrid
+        append (bool) keep the time steps already in the store (resuming)
+    """
+    if detection_info.save_results and detection_info.output_format == "netcdf":
+        wrf_data.set_store(FrontStore(front_store_name(wrf_data.datapath, wrf_data.case_time,\
+                                                       wrf_data.version), wrf_data, grid,\
+                                      append=append))
+
+
+def analyze_levels(wrf_data, grid, detection_info):
+    """analyze_levels: Run find_front_levels for detection_info.levels (if set) and save it
+
+    Input:
+        wrf_data (class) ModelData
+        grid (class) instance of AnalysisGrid
+        detection_info (class) instance of DetectionInfo
+    Output:
+        (list) file names saved
+    """
+    if detection_info.levels is None:
+        return []
+
+    with stage(wrf_data.profiler, "levels"):
+        lon_pts, lat_pts, front_info, depth, depth_m = find_front_levels(wrf_data, grid,\
+                                                                         detection_info.levels)
+    print(wrf_data.version, ":: Levels: ", list(detection_info.levels),\
+          "  |||  Fronts Found: ", np.sum(front_info[0], axis=0).tolist(),\
+          "  |||  Mean Depth: ", round(float(np.mean(depth[depth > 0])), 2) if depth.any() else 0)
+
+    if not detection_info.save_results:
+        return []
+
+    with stage(wrf_data.profiler, "save"):
+        return [save_front_levels(wrf_data, detection_info.levels, lon_pts, lat_pts, front_info,\
+                                  depth, depth_m)]
+
+
+def open_tracker(detection_info, grid):
+    """open_tracker: FrontTracker for one model run (None when not tracking)"""
+    if detection_info.tracking:
+        return FrontTracker(grid, detection_info.track_band)
+    return None
+
+
+def print_front_info(ivar, time_step, front_info):
+    """print_front_info: Progress line for one time step"""
+    print(ivar, time_step, ":: Front Found: ", front_info[0], "  |||  Percentage: ",\
+          front_info[1], "  |||  Length: ", front_info[2])
+
+
+def save_fronts(datapath, case_time, version, master_list, header, prefix="SBF_"):
+    """save_fronts: Save the front locations of one model run
+
+    Input:
+        datapath (string) output directory of the model run
+        case_time (string) formatted case time
+        version (string) Sensitivity test version
+        master_list (2D array) latitude column then longitudes for each time step
+        header (list) column names
+        prefix (string) start of the file name
+    Output:
+        csv file containing the time, lat, long of the frontal locations.
+        outstring (string) name of the csv file
+    """
+    sbf_df = pd.DataFrame(master_list, columns=header)
+
+    outstring = os.path.join(datapath, prefix+case_time.replace("-", "_")+"_"+version+".csv")
+
+    sbf_df.to_csv(outstring, index=False)
+
+    return outstring
+
+
+def save_front_speeds(datapath, case_time, version, lat_pts, speeds, header):
+    """save_front_speeds: Save the propagation speed along the front tracks of one model run
+
+    Input:
+        datapath (string) output directory of the model run
+        case_time (string) formatted case time
+        version (string) Sensitivity test version
+        lat_pts (array) latitude of each row
+        speeds (2D array) speed (m/s, positive = westward) for each row and time step
+        header (list) column names
+    Output:
+        csv file with the same layout as the SBF file (empty where the row was not tracked)
+        (string) name of the csv file
+    """
+    return save_fronts(datapath, case_time, version, np.column_stack((lat_pts, speeds)), header,\
+                prefix="SBF_speed_")
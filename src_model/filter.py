@@ -9,59 +9,86 @@
 from __future__ import print_function
 import numpy as np
 from scipy import ndimage
-from skimage.measure import regionprops
 
 def filter_data(data, grid):
     """filter_data: Remove small clusters of possible frontal value
 
     Input:
-        data (2D array) Front Threshold Values
+        data (array) Front Threshold Values (..., south_north, west_east). Clusters are
+            only connected within the last two dimensions.
         grid (class) AnalysisGrid
     Output:
-        data (2D array) Front Threshold Values - Cleaned
+        data (array) Front Threshold Values - Cleaned
     """
     #Pre-processing data so that the rest of the function will work.
     data[np.isnan(data)] = 0
 
     #See 'ndimage' for more information.
-    simg = ndimage.generate_binary_structure(2, 2) #Create structure
+    #Create structure - 8-connected in the horizontal, never across leading dimensions
+    simg = np.zeros((3,) * data.ndim, dtype=bool)
+    simg[(1,) * (data.ndim-2)] = ndimage.generate_binary_structure(2, 2)
 
     #labeled: each connected feature is given a number to then be
     #analyzed individually.
     #ncomponents: number of individual connected features in data.
-    labeled, ncomponents = ndimage.measurements.label(data, structure=simg)
+    labeled, ncomponents = ndimage.label(data, structure=simg)
 
     #Statistics
     #These build arrays of statistics where each element represents
     #the statistics for the given labeled feature.
     #In other words, the area for labeled feature #5 in 'labeled' is
-    #the fifth element in the 'areas' array below.
+    #the fifth element in the 'areas' array below (element 0 is the background).
+    areas, maj_ax_len = label_statistics(labeled, ncomponents)#in pixels
 
-    #means = ndimage.mean(data, labeled, range(1, ncomponents + 1))
-    #maxs = ndimage.maximum(data, labeled, range(1, ncomponents + 1))
-    #locs = [r.centroid for r in regionprops(labeled)]#center of mass (x/y)
-    areas = [r.filled_area for r in regionprops(labeled)]#in pixels
-    labels = [r.label for r in regionprops(labeled)]#number of feature
-    maj_ax_len = [r.major_axis_length for r in regionprops(labeled)]
-
-    #Iterate through connected features.
-    len_area = len(areas)
-    for i in range(len_area):
-        idx = labeled == labels[i]
-        if maj_ax_len[i] == 0.0:
-            labeled[idx] = 0
-            data[idx] = np.nan
+    #Holes inside a feature count towards its area (regionprops filled_area).
+    #Only features that are too small without their holes but whose bounding box
+    #is large enough can change the result, so only those are filled.
+    objects = ndimage.find_objects(labeled)
+    for label in np.flatnonzero((areas < grid.filter_area) & (maj_ax_len > 0.0)):
+        if label == 0:
             continue
+        image = labeled[objects[label-1]] == label
+        image = image.reshape(image.shape[-2:])
+        if image.size >= grid.filter_area:
+            areas[label] = np.sum(ndimage.binary_fill_holes(image, np.ones((3, 3))))
 
-        #Too small:
-        if areas[i] < grid.filter_area:
-            labeled[idx] = 0
-            data[idx] = np.nan
-        #Or else just continue on to next if statement.
-        else:
-            #print(areas[i])
-            pass
+    #Lookup table - too small (or a single pixel) is removed
+    remove = (maj_ax_len == 0.0) | (areas < grid.filter_area)
+    remove[0] = False
+    data[remove[labeled]] = np.nan
 
     data[data == 0] = np.nan
 
     return data
+
+
+def label_statistics(labeled, ncomponents):
+    """label_statistics: Area and major axis length of every labeled feature in one pass
+
+    Input:
+        labeled (array) labeled features from ndimage.label
+        ncomponents (int) number of labeled features
+    Output:
+        areas (array) number of pixels in each feature (index = label)
+        maj_ax_len (array) major axis length of each feature, as in regionprops
+    """
+    index = np.flatnonzero(labeled)
+    labels = labeled.ravel()[index]
+    coords = np.unravel_index(index, labeled.shape)
+    row = coords[-2].astype(float)
+    col = coords[-1].astype(float)
+
+    areas = np.bincount(labels, minlength=ncomponents+1).astype(float)
+    count = np.maximum(areas, 1.0)
+    mean_row = np.bincount(labels, row, ncomponents+1) / count
+    mean_col = np.bincount(labels, col, ncomponents+1) / count
+
+    #Central moments (inertia tensor) of each feature
+    row = row - mean_row[labels]
+    col = col - mean_col[labels]
+    mu_rr = np.bincount(labels, row*row, ncomponents+1) / count
+    mu_cc = np.bincount(labels, col*col, ncomponents+1) / count
+    mu_rc = np.bincount(labels, row*col, ncomponents+1) / count
+    largest_eigval = (mu_rr + mu_cc)/2.0 + np.sqrt(((mu_rr - mu_cc)/2.0)**2 + mu_rc**2)
+
+    return areas, 4.0*np.sqrt(largest_eigval)
@@ -11,14 +11,15 @@ import os
 import sys
 import numpy as np
 import numpy.ma as ma
-import pandas as pd
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from src_model.get_values_loc import get_values_loc2
+from src_model.upscale import upscale_data, upscale_data_reference
+from src_model.gradient import frontal_strength, threshold_data
 from src_model.detect_front import detect_front
 from src_model.plot_data import plot_data
 from src_model.filter import filter_data
+from src_model.profiler import stage
 
-def find_front(wrf1, grid1):
+def find_front(wrf1, grid1, reference=False, tracker=None):
     """find_front: Calculate and Find the Front
 
     May need to change criteria for what is/isn't a front.
@@ -26,76 +27,114 @@ def find_front(wrf1, grid1):
     Input:
         wrf1 (class) ModelData
         grid1 (class) AnalysisGrid
+        reference (bool) Upscale with the original nugget loop (cross-checking only)
+        tracker (class) FrontTracker - search near the previous front first (None = full scan)
     Output:
         lon_pts -- (list) Longitude points of front
         lat_pts -- (list) Latitude points of front
         found -- (Boolean) True/False: Front Found
     """
-    # Set the dimensions of the WRF domain
-    south_north = wrf1.lat_dim
-    west_east = wrf1.lon_dim
-    #levels = wrf1.vert_dim
-                        # MIN:must be greater than 0
-                        # MAX:one less than the unstaggered dimension #
+    profiler, time_idx, work = wrf1.profiler, wrf1.time_idx, wrf1.workspace
+
+    #Potential temperature at the analysis level - read and calculated for every time
+    #step in the "open" stage unless it is read lazily
+    if wrf1.lazy:
+        with stage(profiler, "read", time_idx):
+            pert_theta = wrf1.read_level_data(grid1.level, grid1.get_read_window())
+        with stage(profiler, "theta", time_idx):
+            theta = wrf1.level_theta(pert_theta, grid1.get_read_window(), work=work)
+    else:
+        theta = wrf1.get_level_data(grid1.level, work=work)
 
-    data_fill = np.empty((south_north, west_east))
+    #Upscale theta to the nugget averages
+    with stage(profiler, "upscale", time_idx):
+        if reference:
+            data_fill = upscale_data_reference(theta, grid1)
+        else:
+            data_fill = upscale_data(theta, grid1, work=work)
 
-    #Fill the array with calculations of theta
-    for ilat in range(grid1.south_start, grid1.north_end, grid1.cell_size):
-        for jlon in range(grid1.west_start, grid1.east_end, grid1.cell_size):
-            theta = get_values_loc2(wrf1.wrf_var[wrf1.time_idx, grid1.level, :, :],\
-                                    grid1.cell_size, ilat, jlon)
-            for idx2 in range(-grid1.cell_size, grid1.cell_size+1):
-                for jdx2 in range(-grid1.cell_size, grid1.cell_size+1):
-                    data_fill[ilat+idx2, jlon+jdx2] = theta
+    with stage(profiler, "gradient", time_idx):
+        #Frontal strength calculations - ALL
+        front_threshold = frontal_strength(data_fill, grid1, work=work)
 
-    #Frontal strength calculations - ALL
-    front_threshold = np.empty((south_north, west_east-grid1.gradient_distance))
+        #Frontal strength calculation - Filter low values
+        front_threshold2 = threshold_data(front_threshold, grid1, work=work)
 
-    #Frontal strength calculation - Filter low values
-    front_threshold2 = np.empty((south_north, west_east-grid1.gradient_distance))
+    #Remove low pixels and small clusters of pixels
+    with stage(profiler, "filter", time_idx):
+        filtered_data = filter_data(front_threshold2, grid1)
+        masked_array = ma.masked_where(filtered_data < grid1.threshold, filtered_data)
 
-    for row in range(grid1.south_start, grid1.north_end):
-        for col in range(grid1.west_start, grid1.east_end-grid1.gradient_distance):
+    with stage(profiler, "detect", time_idx):
+        lon_pts, lat_pts = detect_front(masked_array, grid1, wrf1, tracker)
 
-            front_threshold[row, col] = (data_fill[row, col] -\
-                           data_fill[row, col + grid1.gradient_distance]) /\
-                           grid1.gradient_distance*grid1.dx_1
+        #Determine front characteristics
+        found, ratio_pts, len_long_seq = front_characteristics(lon_pts)
+        found, ratio_pts, len_long_seq = bool(found), float(ratio_pts), int(len_long_seq)
 
-            if front_threshold[row, col] >= grid1.threshold:
-                front_threshold2[row, col] = front_threshold[row, col]
-            else:
-                front_threshold2[row, col] = np.nan
+        if tracker is not None:
+            tracker.update(wrf1.wrf_dt[time_idx], found)
 
+        if not found:
+            lon_pts[:] = [np.nan] * len(lon_pts)
 
-    #Remove low pixels and small clusters of pixels
-    filtered_data = filter_data(front_threshold2, grid1)
-    masked_array = ma.masked_where(filtered_data < grid1.threshold, filtered_data)
-    lon_pts, lat_pts = detect_front(masked_array, grid1, wrf1)
+    output_front(wrf1, grid1, data_fill, front_threshold, front_threshold2, lon_pts, lat_pts)
 
-    #Determine front characteristics
-    tmp_df = pd.DataFrame(lon_pts, index=None)
-    ratio_pts = round(float((1-(tmp_df.isnull().sum()/len(tmp_df))) * 100), 2)
-    sequence = np.array(tmp_df.dropna(how='any').index)
-    longest_seq = max(np.split(sequence, np.where(np.diff(sequence) != 1)[0]+1), key=len)
-    len_long_seq = len(tmp_df.iloc[longest_seq])
+    return lon_pts, lat_pts, [found, ratio_pts, len_long_seq]
 
-    #TODO Check if it meets the characteristics
-    if (ratio_pts > 50.00 and len_long_seq > 20) or (ratio_pts > 30.00 and len_long_seq > 45):
-        found = True
-    else:
-        found = False
-        lon_pts[:] = [np.nan] * len(lon_pts)
 
-    if wrf1.save:
-        np.savetxt(wrf1.datapath+"/2D_front_"+wrf1.case_time.replace("-", "_")+"_"+\
-                   wrf1.version+"_"+str(wrf1.time_idx)+".csv", front_threshold,\
-                   delimiter=',', fmt='%f')
+def output_front(wrf1, grid1, data_fill, front_threshold, front_threshold2, lon_pts, lat_pts):
+    """output_front: Save the 2D fields and plot the front for the current time step
 
-        np.savetxt(wrf1.datapath+"/2D_theta_"+wrf1.case_time.replace("-", "_")+"_"+\
-                   wrf1.version+"_"+str(wrf1.time_idx)+".csv", data_fill,\
-                   delimiter=',', fmt='%f')
+    Input:
+        wrf1 (class) ModelData
+        grid1 (class) AnalysisGrid
+        data_fill (2D array) upscaled theta
+        front_threshold (2D array) frontal strength - ALL
+        front_threshold2 (2D array) frontal strength - filtered
+        lon_pts -- (list) Longitude points of front
+        lat_pts -- (list) Latitude points of front
+    Output:
+        None
+    """
+    with stage(wrf1.profiler, "save", wrf1.time_idx):
+        if wrf1.save and wrf1.store is not None:
+            wrf1.store.append(wrf1.time_idx, wrf1.wrf_dt[wrf1.time_idx], front_threshold,\
+                              data_fill)
 
-    plot_data(wrf1, grid1, front_threshold2, lon_pts, lat_pts)
+        elif wrf1.save:
+            np.savetxt(wrf1.datapath+"/2D_front_"+wrf1.case_time.replace("-", "_")+"_"+\
+                       wrf1.version+"_"+str(wrf1.time_idx)+".csv", front_threshold,\
+                       delimiter=',', fmt='%f')
 
-    return lon_pts, lat_pts, [found, ratio_pts, len_long_seq]
+            np.savetxt(wrf1.datapath+"/2D_theta_"+wrf1.case_time.replace("-", "_")+"_"+\
+                       wrf1.version+"_"+str(wrf1.time_idx)+".csv", data_fill,\
+                       delimiter=',', fmt='%f')
+
+    with stage(wrf1.profiler, "plot", wrf1.time_idx):
+        plot_data(wrf1, grid1, front_threshold2, lon_pts, lat_pts)
+
+
+def front_characteristics(lon_pts):
+    """front_characteristics: Determine if the front points found make up a front
+
+    Input:
+        lon_pts (list/array) Longitude points of front (..., rows)
+    Output:
+        found (bool array) True/False: Front Found
+        ratio_pts (array) percentage of rows with a front point
+        len_long_seq (array) longest sequence of consecutive rows with a front point
+    """
+    valid = ~np.isnan(np.asarray(lon_pts, dtype=float))
+    ratio_pts = np.round((1-(np.sum(~valid, axis=-1)/valid.shape[-1])) * 100, 2)
+
+    #Length of the run of points ending at each row - restart the count after a gap
+    count = np.cumsum(valid, axis=-1)
+    restart = np.maximum.accumulate(np.where(valid, 0, count), axis=-1)
+    len_long_seq = np.max(count - restart, axis=-1)
+
+    #TODO Check if it meets the characteristics
+    found = ((ratio_pts > 50.00) & (len_long_seq > 20)) |\
+            ((ratio_pts > 30.00) & (len_long_seq > 45))
+
+    return found, ratio_pts, len_long_seq
@@ -0,0 +1,97 @@
+"""Copyright (C) 2018-Present E. Allen, D. Moore, D. Veron - University of Delaware"""
+#
+# You may use, distribute and modify this code under the
+# terms of the GNU Lesser General Public License v3.0 license.
+#
+# https://www.gnu.org/licenses/lgpl-3.0.en.html
+#
+# Imports
+from __future__ import print_function
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src_model.upscale import upscale_data
+from src_model.gradient import frontal_strength, threshold_data
+from src_model.detect_front import leading_edge
+from src_model.filter import filter_data
+from src_model.find_front import front_characteristics, output_front
+from src_model.profiler import stage
+
+def find_front_batch(wrf1, grid1, tracker=None):
+    """find_front_batch: Calculate and Find the Front for every time step at once
+
+    Same result as calling find_front for each time step, but each stage runs on
+    the (time, lat, lon) block of the analysis level. With a tracker the leading edge
+    is located one time step after another, each search starting near the previous front.
+
+    Input:
+        wrf1 (class) ModelData
+        grid1 (class) AnalysisGrid
+        tracker (class) FrontTracker (None = full scan)
+    Output:
+        master_list -- (2D array) latitude column followed by the front longitudes
+                        of each time step (rows x time steps + 1)
+        header -- (list) column names for master_list
+        front_info -- (list) [found, ratio_pts, len_long_seq] for each time step
+    """
+    profiler, work = wrf1.profiler, wrf1.workspace
+
+    #Read and calculated in the "open" stage unless it is read lazily
+    if wrf1.lazy:
+        with stage(profiler, "read"):
+            pert_theta = wrf1.read_level_data(grid1.level, grid1.get_read_window(),\
+                                              all_times=True)
+        with stage(profiler, "theta"):
+            theta = wrf1.level_theta(pert_theta, grid1.get_read_window(), work=work)
+    else:
+        theta = wrf1.get_level_data(grid1.level, all_times=True, work=work)
+
+    with stage(profiler, "upscale"):
+        data_fill = upscale_data(theta, grid1, work=work)
+
+    with stage(profiler, "gradient"):
+        front_threshold = frontal_strength(data_fill, grid1, work=work)
+        front_threshold2 = threshold_data(front_threshold, grid1, work=work)
+
+    #Remove low pixels and small clusters of pixels - each time step separately
+    with stage(profiler, "filter"):
+        filtered_data = filter_data(front_threshold2, grid1)
+
+    with stage(profiler, "detect"):
+        rows = np.arange(grid1.south_start, grid1.north_end)
+        if tracker is None:
+            foundidx, found_pts = leading_edge(filtered_data, grid1)
+        else:
+            foundidx = np.zeros((len(wrf1.wrf_dt), len(rows)), dtype=int)
+            found_pts = np.zeros((len(wrf1.wrf_dt), len(rows)), dtype=bool)
+            for time_step in range(len(wrf1.wrf_dt)):
+                foundidx[time_step], found_pts[time_step] =\
+                    tracker.locate(filtered_data[time_step], grid1)
+                step_lon = np.where(found_pts[time_step], wrf1.lons[rows, foundidx[time_step]],\
+                                    np.nan)
+                tracker.update(wrf1.wrf_dt[time_step], bool(front_characteristics(step_lon)[0]))
+
+        lon_pts = np.where(found_pts, wrf1.lons[rows, foundidx], np.nan)
+        lat_pts = np.where(found_pts, wrf1.lats[rows, foundidx], wrf1.lats[rows, 0])
+
+        #Determine front characteristics
+        found, ratio_pts, len_long_seq = front_characteristics(lon_pts)
+        lon_pts[~found, :] = np.nan
+
+    for time_step in range(len(wrf1.wrf_dt)):
+        wrf1.set_timestep(time_step)
+        output_front(wrf1, grid1, data_fill[time_step], front_threshold[time_step],\
+                     filtered_data[time_step], lon_pts[time_step], lat_pts[time_step])
+
+    #Latitudes come from the first time step, as in driver
+    master_list = np.zeros((len(rows), len(wrf1.wrf_dt)+1))
+    master_list[:, 0] = lat_pts[0]
+    master_list[:, 1:] = lon_pts.T
+
+    header = ["LATITUDE"] + [time.strftime("%m%d%Y_%H%M") for time in wrf1.wrf_dt]
+
+    front_info = [[bool(found[idx]), float(ratio_pts[idx]), int(len_long_seq[idx])]\
+                  for idx in range(len(wrf1.wrf_dt))]
+
+    return master_list, header, front_info
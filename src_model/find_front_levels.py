@@ -0,0 +1,135 @@
+"""Copyright (C) 2018-Present E. Allen, D. Moore, D. Veron - University of Delaware"""
+#
+# You may use, distribute and modify this code under the
+# terms of the GNU Lesser General Public License v3.0 license.
+#
+# https://www.gnu.org/licenses/lgpl-3.0.en.html
+#
+# Imports
+from __future__ import print_function
+import os
+import sys
+import numpy as np
+from netCDF4 import Dataset, date2num
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src_model.upscale import upscale_data
+from src_model.gradient import frontal_strength, threshold_data
+from src_model.detect_front import leading_edge
+from src_model.filter import filter_data
+from src_model.find_front import front_characteristics
+from src_model.front_store import TIME_UNITS
+
+def find_front_levels(wrf1, grid1, levels):
+    """find_front_levels: Find the front at several model levels and every time step
+
+    One time step is held at a time: theta is read for the requested levels only and
+    each stage runs on the (level, lat, lon) block (its arrays are reused from the
+    workspace every time step), with every level treated exactly like grid1.level in
+    find_front_batch.
+
+    The depth of the front in each row is the number of levels, from the lowest level
+    up, where the front was found with its leading edge no more than gradient_distance
+    columns from the leading edge on the level below.
+
+    Input:
+        wrf1 (class) ModelData
+        grid1 (class) AnalysisGrid
+        levels (list) model levels (ascending)
+    Output:
+        lon_pts -- (3D array) front longitudes (time, level, row). NaN = no front
+        lat_pts -- (1D array) latitude of each row (first column)
+        front_info -- (list of 3D array) found, ratio_pts, len_long_seq (time, level)
+        depth -- (2D array) number of levels of the front (time, row)
+        depth_m -- (2D array) height above ground (m) of the top of the front (time, row)
+    """
+    levels = np.asarray(levels)
+    work = wrf1.workspace
+    rows = np.arange(grid1.south_start, grid1.north_end)
+
+    all_lon_pts, all_front_info, all_depth, all_depth_m = [], [], [], []
+    for time_step in range(len(wrf1.wrf_dt)):
+        theta = wrf1.get_level_data(levels, grid1.get_read_window(), work=work,\
+                                    time_idx=time_step)
+
+        data_fill = upscale_data(theta, grid1, work=work)
+        front_threshold = threshold_data(frontal_strength(data_fill, grid1, work=work), grid1,\
+                                         work=work)
+
+        #Remove low pixels and small clusters of pixels - each level separately
+        filtered_data = filter_data(front_threshold, grid1)
+        foundidx, found_pts = leading_edge(filtered_data, grid1)
+
+        lon_pts = np.where(found_pts, wrf1.lons[rows, foundidx], np.nan)
+        front_info = front_characteristics(lon_pts)
+        found_pts &= front_info[0][:, None]
+        lon_pts[~found_pts] = np.nan
+
+        #Continuous from the lowest level up, tilting at most gradient_distance per level
+        connected = found_pts.copy()
+        connected[1:] &= np.abs(np.diff(foundidx, axis=0)) <= grid1.gradient_distance
+        depth = np.sum(np.cumprod(connected, axis=0), axis=0)
+
+        depth_m = np.full(depth.shape, np.nan)
+        heights = wrf1.get_level_heights(levels, time_step)
+        if heights is not None:
+            top = np.maximum(depth-1, 0)
+            top_col = np.take_along_axis(foundidx, top[None, :], axis=0)[0]
+            depth_m = np.where(depth > 0, heights[top, rows, top_col], np.nan)
+
+        all_lon_pts.append(lon_pts)
+        all_front_info.append(front_info)
+        all_depth.append(depth)
+        all_depth_m.append(depth_m)
+
+    front_info = [np.stack([info[i] for info in all_front_info]) for i in range(3)]
+    return np.stack(all_lon_pts), wrf1.lats[rows, 0], front_info, np.stack(all_depth),\
+           np.stack(all_depth_m)
+
+
+def save_front_levels(wrf1, levels, lon_pts, lat_pts, front_info, depth, depth_m):
+    """save_front_levels: Save the output of find_front_levels to a netcdf file
+
+    Input:
+        wrf1 (class) ModelData
+        levels (list) model levels
+        lon_pts, lat_pts, front_info, depth, depth_m -- output of find_front_levels
+    Output:
+        filename (string) 3D_fronts_<case>_<version>.nc in datapath
+    """
+    filename = os.path.join(wrf1.datapath, "3D_fronts_"+wrf1.case_time.replace("-", "_")+"_"+\
+                            wrf1.version+".nc")
+
+    ncfile = Dataset(filename, "w")
+    try:
+        ncfile.case_time = wrf1.case_time
+        ncfile.version = wrf1.version
+        ncfile.createDimension("time", len(wrf1.wrf_dt))
+        ncfile.createDimension("level", len(levels))
+        ncfile.createDimension("row", len(lat_pts))
+
+        time = ncfile.createVariable("time", "f8", ("time",))
+        time.units = TIME_UNITS
+        time[:] = date2num(list(wrf1.wrf_dt), TIME_UNITS)
+        ncfile.createVariable("level", "i4", ("level",))[:] = levels
+        ncfile.createVariable("latitude", "f4", ("row",))[:] = lat_pts
+
+        lon = ncfile.createVariable("longitude", "f4", ("time", "level", "row"),\
+                                    zlib=True, fill_value=np.nan)
+        lon.long_name = "Front longitude"
+        lon[:] = lon_pts
+
+        for name, values in zip(("found", "percentage", "length"), front_info):
+            ncfile.createVariable(name, "f4", ("time", "level"))[:] = values
+
+        var = ncfile.createVariable("depth", "i4", ("time", "row"))
+        var.long_name = "Number of levels of the front, from the lowest level up"
+        var[:] = depth
+
+        var = ncfile.createVariable("depth_m", "f4", ("time", "row"), fill_value=np.nan)
+        var.long_name = "Height above ground of the top of the front (at each time step)"
+        var.units = "m"
+        var[:] = depth_m
+    finally:
+        ncfile.close()
+
+    return filename
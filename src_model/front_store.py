@@ -0,0 +1,117 @@
+"""Copyright (C) 2018-Present E. Allen, D. Moore, D. Veron - University of Delaware"""
+#
+# You may use, distribute and modify this code under the
+# terms of the GNU Lesser General Public License v3.0 license.
+#
+# https://www.gnu.org/licenses/lgpl-3.0.en.html
+#
+# Imports
+from __future__ import print_function
+import os
+import numpy as np
+from netCDF4 import Dataset, date2num, num2date
+
+TIME_UNITS = "minutes since 1970-01-01 00:00:00"
+
+class FrontStore:
+    """
+    Compressed netcdf file holding the 2D frontal strength and upscaled theta
+    of one case/version. Time steps are written as they are calculated.
+
+    Input:
+        filename (string) netcdf file to create
+        wrf (class) ModelData
+        grid (class) AnalysisGrid
+        append (bool) open an existing store to add time steps (resuming a run)
+    Output:
+        class object
+    """
+    def __init__(self, filename, wrf, grid, append=False):
+        self.filename = filename
+        if append and os.path.exists(filename):
+            self.ncfile = Dataset(filename, "a")
+            return
+
+        self.ncfile = Dataset(filename, "w")
+
+        self.ncfile.case_time = wrf.case_time
+        self.ncfile.version = wrf.version
+        for name, value in zip(("level", "dx_1", "cell_size", "gradient_distance",\
+                                "west_start", "east_end", "south_start", "north_end",\
+                                "threshold", "filter_area"), grid.get_config()):
+            setattr(self.ncfile, name, value)
+
+        self.ncfile.createDimension("time", None)
+        self.ncfile.createDimension("south_north", wrf.lat_dim)
+        self.ncfile.createDimension("west_east", wrf.lon_dim)
+        self.ncfile.createDimension("west_east_front", wrf.lon_dim-grid.gradient_distance)
+
+        time = self.ncfile.createVariable("time", "f8", ("time",))
+        time.units = TIME_UNITS
+        self.ncfile.createVariable("time_idx", "i4", ("time",))
+
+        #One chunk per time step - each step is written and read whole
+        front = self.ncfile.createVariable("front", "f4",\
+                                           ("time", "south_north", "west_east_front"),\
+                                           zlib=True, shuffle=True, fill_value=np.nan,\
+                                           chunksizes=(1, wrf.lat_dim,\
+                                                       wrf.lon_dim-grid.gradient_distance))
+        front.long_name = "Frontal strength (all values)"
+
+        theta = self.ncfile.createVariable("theta", "f4", ("time", "south_north", "west_east"),\
+                                           zlib=True, shuffle=True, fill_value=np.nan,\
+                                           chunksizes=(1, wrf.lat_dim, wrf.lon_dim))
+        theta.long_name = "Upscaled potential temperature"
+        theta.units = "K"
+
+    def append(self, time_idx, time, front_threshold, data_fill):
+        """append: Write one time step
+
+        Input:
+            time_idx (int) model time index
+            time (datetime) model time
+            front_threshold (2D array) frontal strength - ALL
+            data_fill (2D array) upscaled theta
+        """
+        self.ncfile.variables["time"][time_idx] = date2num(time, TIME_UNITS)
+        self.ncfile.variables["time_idx"][time_idx] = time_idx
+        self.ncfile.variables["front"][time_idx] = front_threshold
+        self.ncfile.variables["theta"][time_idx] = data_fill
+        self.ncfile.sync()
+
+    def close(self):
+        """close the netcdf file (nothing to do when it is already closed)"""
+        if self.ncfile.isopen():
+            self.ncfile.close()
+
+
+def front_store_name(datapath, case_time, version):
+    """front_store_name: netcdf file name for one case/version (next to the SBF csv)"""
+    return os.path.join(datapath, "2D_fields_"+case_time.replace("-", "_")+"_"+version+".nc")
+
+
+def read_front_store(filename, time_idx=None):
+    """read_front_store: Read 2D frontal strength and upscaled theta written by FrontStore
+
+    Input:
+        filename (string) netcdf file
+        time_idx (int/slice) time steps to read. None = all
+    Output:
+        wrf_dt (list) datetime objects of the time steps read
+        front_threshold (array) frontal strength - ALL (time, south_north, west_east_front)
+        data_fill (array) upscaled theta (time, south_north, west_east)
+    """
+    if time_idx is None:
+        time_idx = slice(None)
+
+    ncfile = Dataset(filename, "r")
+    try:
+        times = np.atleast_1d(ncfile.variables["time"][time_idx])
+        wrf_dt = list(num2date(times, TIME_UNITS, only_use_cftime_datetimes=False,\
+                               only_use_python_datetimes=True))
+        front_threshold = np.ma.filled(ncfile.variables["front"][time_idx], np.nan)
+        data_fill = np.ma.filled(ncfile.variables["theta"][time_idx], np.nan)
+    finally:
+        ncfile.close()
+
+    return wrf_dt, front_threshold, data_fill
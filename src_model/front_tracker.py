@@ -0,0 +1,101 @@
+"""Copyright (C) 2018-Present E. Allen, D. Moore, D. Veron - University of Delaware"""
+#
+# You may use, distribute and modify this code under the
+# terms of the GNU Lesser General Public License v3.0 license.
+#
+# https://www.gnu.org/licenses/lgpl-3.0.en.html
+#
+# Imports
+from __future__ import print_function
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src_model.detect_front import leading_edge, leading_edge_tracked
+
+class FrontTracker:
+    """
+    Carry the front forward in time for one case/version.
+
+    The column of the front in each row is kept from one time step to the next and
+    the next search starts within band columns of it (leading_edge_tracked). Rows
+    found inside the band at consecutive time steps form a continuous track, and
+    their propagation speed is recorded (m/s, positive = westward).
+
+    The prior is cleared when a time step does not meet the front criteria, so a
+    new front is always located with the full scan.
+
+    Input:
+        grid (class) AnalysisGrid
+        band (int) number of columns searched on either side of the previous front
+    Output:
+        class object
+    """
+    def __init__(self, grid, band):
+        self.band = band
+        self.resolution = grid.dx_1
+        self.prior_idx = np.full(grid.north_end-grid.south_start, -1)
+        self.prior_time = None
+        self.located = None
+        self.speeds = []
+
+    def locate(self, data, grid):
+        """locate: Column of the front in every row for the current time step
+
+        Input:
+            data (2D array or masked array) Front Threshold Values
+            grid (class) AnalysisGrid
+        Output:
+            foundidx (array) column index of the front for each row in the analysis window
+            found (array) boolean, True where a front point was found in the row
+        """
+        if self.prior_time is None:
+            foundidx, found = leading_edge(data, grid)
+            tracked = np.zeros_like(found)
+        else:
+            foundidx, found, tracked = leading_edge_tracked(data, grid, self.prior_idx,\
+                                                            self.band)
+
+        self.located = (foundidx, found, tracked)
+        return foundidx, found
+
+    def update(self, time, front_found):
+        """update: Record the speed along the tracks and set the prior for the next time step
+
+        Input:
+            time (datetime) time of the current time step
+            front_found (bool) the current time step meets the front criteria
+        """
+        foundidx, found, tracked = self.located
+        speed = np.full(len(foundidx), np.nan)
+
+        if front_found:
+            if self.prior_time is not None:
+                seconds = (time - self.prior_time).total_seconds()
+                #Columns moved west * km per column -> m/s
+                speed[tracked] = (self.prior_idx[tracked] - foundidx[tracked]) *\
+                                 self.resolution * 1000. / seconds
+            self.prior_idx = np.where(found, foundidx, -1)
+            self.prior_time = time
+        else:
+            self.prior_idx[:] = -1
+            self.prior_time = None
+
+        self.speeds.append(speed)
+        self.located = None
+
+    def restore(self, prior_idx, prior_time, speeds):
+        """restore: Continue tracking from a checkpoint
+
+        Input:
+            prior_idx (array) column index of the front in each row (-1 = none)
+            prior_time (datetime) time of prior_idx (None = no prior)
+            speeds (list) speed arrays of the finished time steps
+        """
+        self.prior_idx = np.array(prior_idx)
+        self.prior_time = prior_time
+        self.speeds = list(speeds)
+
+    def speed_table(self):
+        """speed_table: (2D array) propagation speed for each row (rows x time steps)"""
+        return np.column_stack(self.speeds)
@@ -0,0 +1,60 @@
+"""Copyright (C) 2018-Present E. Allen, D. Moore, D. Veron - University of Delaware"""
+#
+# You may use, distribute and modify this code under the
+# terms of the GNU Lesser General Public License v3.0 license.
+#
+# https://www.gnu.org/licenses/lgpl-3.0.en.html
+#
+# Imports
+from __future__ import print_function
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src_model.workspace import full
+
+def frontal_strength(data_fill, grid, work=None):
+    """frontal_strength: Frontal strength (theta change to the east) for the analysis window
+
+    Input:
+        data_fill (array) upscaled theta values (..., south_north, west_east)
+        grid (class) AnalysisGrid
+        work (class) Workspace for the output (None = new float64 array)
+    Output:
+        gradient (array) frontal strength (..., south_north, west_east - gradient_distance),
+            NaN outside of the analysis window
+    """
+    west = grid.west_start
+    east = grid.east_end - grid.gradient_distance
+
+    gradient = full(work, "gradient",\
+                    data_fill.shape[:-1] + (data_fill.shape[-1]-grid.gradient_distance,), np.nan)
+
+    #(east - west) / gradient_distance * dx, without temporary arrays
+    window = gradient[..., grid.south_start:grid.north_end, west:east]
+    np.subtract(data_fill[..., grid.south_start:grid.north_end, west:east],\
+                data_fill[..., grid.south_start:grid.north_end,\
+                          west+grid.gradient_distance:east+grid.gradient_distance], out=window)
+    window /= grid.gradient_distance
+    window *= grid.dx_1
+
+    return gradient
+
+
+def threshold_data(gradient, grid, work=None):
+    """threshold_data: Keep only frontal strength values at or above the threshold
+
+    Input:
+        gradient (array) frontal strength from frontal_strength
+        grid (class) AnalysisGrid
+        work (class) Workspace for the output (None = new array)
+    Output:
+        (array) copy of gradient with values below the threshold set to NaN
+    """
+    if work is None:
+        return np.where(gradient >= grid.threshold, gradient, np.nan)
+
+    filtered = work.get("threshold", gradient.shape)
+    np.copyto(filtered, gradient)
+    filtered[~(gradient >= grid.threshold)] = np.nan
+    return filtered
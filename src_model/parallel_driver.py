@@ -0,0 +1,212 @@
+"""Copyright (C) 2018-Present E. Allen, D. Moore, D. Veron - University of Delaware"""
+#
+# You may use, distribute and modify this code under the
+# terms of the GNU Lesser General Public License v3.0 license.
+#
+# https://www.gnu.org/licenses/lgpl-3.0.en.html
+#
+# Imports
+from __future__ import print_function
+import os
+import sys
+import multiprocessing
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src_model.find_front import find_front
+from src_model.find_front_batch import find_front_batch
+from src_model.profiler import StageProfiler, stage
+from src_model.front_store import front_store_name
+from src_model.checkpoint import is_complete, write_manifest, run_settings
+from src_model.driver import analyze_levels, open_model_run, open_store, open_tracker,\
+                             print_front_info, save_fronts, save_front_speeds
+from commonclass.AnalysisGrid import AnalysisGrid
+from commonclass.DetectionInfo import DetectionInfo
+
+def parallel_driver(grid, detection_info, processes=None, split_timesteps=1):
+    """parallel_driver: Run the detection algorithm with a pool of processes
+
+    Every (case, version) is a work item. With split_timesteps > 1 the time steps of
+    each version are divided between that many work items (every split_timesteps-th
+    time step) and merged again before the results are saved. Each process opens
+    its own ModelData, so no state is shared between work items. Output files are
+    named exactly as in driver. With resume, complete (case, version) pairs are
+    skipped; unfinished ones start over.
+
+    Input:
+        grid (class) instance of AnalysisGrid
+        detection_info (class) instance of DetectionInfo
+        processes (int) number of worker processes (None = number of CPUs)
+        split_timesteps (int) number of work items per (case, version)
+    Output:
+        None
+        csv file containing the time, lat, long of the frontal locations.
+    """
+    grid.print_info()
+
+    detection_info.print_info()
+
+    #Batch mode already works on all time steps at once, a netcdf store can only
+    #be written by one process, tracking needs the time steps in order and eager
+    #reads would read and calculate theta for the whole run in every work item
+    if detection_info.batch_mode or detection_info.output_format == "netcdf" or\
+       detection_info.tracking or not detection_info.lazy_read:
+        split_timesteps = 1
+
+    grid_config = grid.get_config()
+    info_config = detection_info.get_config()
+    settings = run_settings(grid, detection_info)
+    work_items = [(grid_config, info_config, case, ivar, chunk, split_timesteps)\
+                  for case in detection_info.casestudy_times\
+                  for ivar in detection_info.independent_variables\
+                  for chunk in range(split_timesteps)]
+
+    #Stage timings recorded by the workers
+    profiler = StageProfiler(memory=False) if detection_info.profile else None
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        partial = {}
+        for count, result in enumerate(pool.imap_unordered(_detect_work_item, work_items)):
+            case, ivar, chunk = result["case"], result["version"], result["chunk"]
+            print("[", count+1, "/", len(work_items), "]", case, ivar,\
+                  "part", chunk+1, "of", split_timesteps)
+            if result["skipped"]:
+                print(ivar, ":: Already complete. Skipping...")
+            for time_step in sorted(result["front_info"]):
+                print_front_info(ivar, time_step, result["front_info"][time_step])
+            sys.stdout.flush()
+
+            #Merge the parts of a (case, version) once they have all finished
+            partial.setdefault((case, ivar), []).append(result)
+            if profiler is not None:
+                profiler.records.extend(result["profile"])
+            if len(partial[(case, ivar)]) == split_timesteps:
+                parts = partial.pop((case, ivar))
+                if detection_info.save_results and not any(part["skipped"] for part in parts):
+                    master_list, header = merge_work_items(parts)
+                    outputs = [save_fronts(result["datapath"], result["case_time"], ivar,\
+                                           master_list, header)]
+                    if result["speeds"] is not None:
+                        outputs.append(save_front_speeds(result["datapath"], result["case_time"],\
+                                                         ivar, master_list[:, 0],\
+                                                         result["speeds"], header))
+                    if detection_info.output_format == "netcdf":
+                        outputs.append(front_store_name(result["datapath"], result["case_time"],\
+                                                        ivar))
+                    for part in parts:
+                        outputs.extend(part["outputs"])
+                    write_manifest(result["datapath"], result["case_time"], ivar,\
+                                   result["wrf_dt"], outputs, settings)
+                    if profiler is not None:
+                        profiler.set_run(case, ivar)
+                        profiler.save(result["datapath"], result["case_time"])
+        pool.close()
+
+        if profiler is not None:
+            profiler.print_summary()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def merge_work_items(results):
+    """merge_work_items: Combine the time steps of one (case, version) into master_list
+
+    Input:
+        results (list) results of _detect_work_item for one (case, version)
+    Output:
+        master_list (2D array) latitude column then longitudes for each time step
+        header (list) column names
+    """
+    lon_pts = {}
+    times = {}
+    for result in results:
+        lon_pts.update(result["lon_pts"])
+        times.update(result["times"])
+        if 0 in result["lon_pts"]:
+            lat_pts = result["lat_pts"]
+
+    master_list = np.zeros((len(lat_pts), len(times)+1))
+    master_list[:, 0] = lat_pts
+    for time_step in lon_pts:
+        master_list[:, time_step+1] = lon_pts[time_step]
+
+    header = ["LATITUDE"] + [times[time_step] for time_step in sorted(times)]
+
+    return master_list, header
+
+
+def _detect_work_item(args):
+    """_detect_work_item: Detect the front for one work item (runs in a worker process)"""
+    grid_config, info_config, case, ivar, chunk, split_timesteps = args
+
+    grid = AnalysisGrid(*grid_config)
+    info_config = dict(info_config)
+    data_directory = info_config.pop("data_directory")
+    wpsfile = info_config.pop("wpsfile")
+    #Pool workers cannot start their own plotting processes
+    info_config["plot_processes"] = 0
+    detection_info = DetectionInfo(**info_config)
+    detection_info.set_data_dir(data_directory)
+    detection_info.set_namelistwps(wpsfile)
+
+    profiler = None
+    if detection_info.profile:
+        profiler = StageProfiler()
+        profiler.set_run(case, ivar)
+
+    with stage(profiler, "open"):
+        wrf_data = open_model_run(case, ivar, detection_info, grid)
+    wrf_data.set_profiler(profiler)
+    tracker = open_tracker(detection_info, grid)
+
+    result = {"case": case, "version": ivar, "chunk": chunk,\
+              "case_time": wrf_data.case_time, "datapath": wrf_data.datapath,\
+              "wrf_dt": wrf_data.wrf_dt, "lon_pts": {}, "lat_pts": None, "times": {},\
+              "front_info": {}, "speeds": None, "profile": [], "skipped": False,\
+              "outputs": []}
+
+    try:
+        #Finished in an earlier run
+        if detection_info.resume and is_complete(wrf_data.datapath, wrf_data.case_time,\
+                                                 wrf_data.version, wrf_data.wrf_dt,\
+                                                 run_settings(grid, detection_info)):
+            result["skipped"] = True
+
+        elif detection_info.batch_mode:
+            open_store(wrf_data, detection_info, grid)
+            master_list, header, all_front_info = find_front_batch(wrf_data, grid, tracker)
+            result["lat_pts"] = master_list[:, 0]
+            for time_step, front_info in enumerate(all_front_info):
+                result["lon_pts"][time_step] = master_list[:, time_step+1]
+                result["times"][time_step] = header[time_step+1]
+                result["front_info"][time_step] = front_info
+        else:
+            open_store(wrf_data, detection_info, grid)
+            for time_step in range(chunk, len(wrf_data.wrf_dt), split_timesteps):
+                wrf_data.set_timestep(time_step)
+                out_lon, out_lat, front_info = find_front(wrf_data, grid, tracker=tracker)
+
+                result["lon_pts"][time_step] = out_lon
+                result["times"][time_step] = wrf_data.wrf_dt[time_step].strftime("%m%d%Y_%H%M")
+                result["front_info"][time_step] = front_info
+                if time_step == 0:
+                    result["lat_pts"] = out_lat
+
+        #Front at several model levels (once per case/version)
+        if chunk == 0 and not result["skipped"]:
+            result["outputs"] = analyze_levels(wrf_data, grid, detection_info)
+
+        if tracker is not None and not result["skipped"]:
+            result["speeds"] = tracker.speed_table()
+    finally:
+        #Also when detection fails, so the time steps already written are kept
+        with stage(profiler, "save"):
+            if wrf_data.store is not None:
+                wrf_data.store.close()
+
+    if profiler is not None:
+        result["profile"] = profiler.records
+        profiler.close()
+
+    return result
@@ -0,0 +1,79 @@
+"""Copyright (C) 2018-Present E. Allen, D. Moore, D. Veron - University of Delaware"""
+#
+# You may use, distribute and modify this code under the
+# terms of the GNU Lesser General Public License v3.0 license.
+#
+# https://www.gnu.org/licenses/lgpl-3.0.en.html
+#
+# Imports
+from __future__ import print_function
+import os
+import sys
+import numpy as np
+import cartopy.crs as ccrs
+import cartopy.io.shapereader as shpreader
+import cartopy.feature as cfeature
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from commonclass.namelist_plot import wps_info
+
+#Contexts already built in this process: (wpsfile, shapefile, domain bounds) -> PlotContext
+_CONTEXTS = {}
+
+class PlotContext:
+    """
+    Map background for plot_data that only needs to be built once per run:
+    the namelist.wps projection/domain info and the county outlines that fall
+    inside the model domain.
+
+    Input:
+        wpsfile (string) path to the namelist.wps file
+        shapefile (string) path to the county shapefile
+        bounds (tuple) (lon_min, lat_min, lon_max, lat_max) of the model domain
+    Output:
+        class object
+    """
+    def __init__(self, wpsfile, shapefile, bounds):
+        ## Get/Store WPS Data - recreate the domain
+        wps = wps_info(wpsfile)
+        self.domain_info = wps.calc_wps_domain_info()
+        self.wpsproj = self.domain_info[0]
+
+        #Only keep the counties that overlap the domain
+        try:
+            reader = shpreader.Reader(shapefile)
+            counties = [geom for geom in reader.geometries()\
+                        if geom.bounds[0] <= bounds[2] and geom.bounds[2] >= bounds[0] and\
+                           geom.bounds[1] <= bounds[3] and geom.bounds[3] >= bounds[1]]
+            self.counties = cfeature.ShapelyFeature(counties, ccrs.PlateCarree())
+        except ImportError:
+            self.counties = None
+
+    def add_map_layers(self, ax1):
+        """Add map layers for counties/states/coastlines/etc."""
+        if self.counties is not None:
+            ax1.add_feature(self.counties, facecolor='none', edgecolor='darkslategray')
+        else:
+            ax1.add_feature(cfeature.STATES.with_scale('10m'),\
+                              edgecolor='darkslategray', linewidth=1)
+            ax1.coastlines('10m', 'darkslategray', linewidth=1)
+
+
+def domain_bounds(lons, lats):
+    """domain_bounds: (lon_min, lat_min, lon_max, lat_max) of the model domain"""
+    return (float(np.min(lons)), float(np.min(lats)), float(np.max(lons)), float(np.max(lats)))
+
+
+def get_plot_context(wpsfile, bounds, shapefile):
+    """get_plot_context: PlotContext for this model run, built on first use and then reused
+
+    Input:
+        wpsfile -- (string) path to the namelist.wps file
+        bounds -- (tuple) domain bounds from domain_bounds
+        shapefile -- (string) county shapefile
+    Output:
+        (class) PlotContext
+    """
+    key = (wpsfile, shapefile, bounds)
+    if key not in _CONTEXTS:
+        _CONTEXTS[key] = PlotContext(wpsfile, shapefile, bounds)
+    return _CONTEXTS[key]
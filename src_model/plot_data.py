@@ -9,17 +9,18 @@
 from __future__ import print_function
 import os
 import sys
+import numpy as np
 import matplotlib.pyplot as plt
-import cartopy
 import cartopy.crs as ccrs
-import cartopy.io.shapereader as shpreader
-import cartopy.feature as cfeature
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from commonclass.namelist_plot import wps_info
+from src_model.plot_context import get_plot_context, domain_bounds
 
 def plot_data(pwrf, pgrid, gridded_data, lon_pts, lat_pts):
     """plot_data: Plot the data
 
+    When a PlotQueue has been set on ModelData (and results are saved) the figure
+    is handed to the queue and rendered in the background.
+
     Input:
         pwrf -- (class) ModelData
         pgrid -- class AnalysisGrid
@@ -30,42 +31,68 @@ def plot_data(pwrf, pgrid, gridded_data, lon_pts, lat_pts):
         Optional: Save Figure
         None
     """
-    ## Get/Store WPS Data - recreate the domain
-    wps = wps_info(pwrf.wpsfile)
+    window = (slice(pgrid.south_start, pgrid.north_end),\
+              slice(pgrid.west_start, pgrid.east_end-pgrid.gradient_distance))
+
+    if pwrf.save:
+        outfile = pwrf.mappath+"/Frontal_Strength_Analysis_"+\
+                    pwrf.wrf_dt[pwrf.time_idx].strftime("%Y_%m_%d_%H%M")+\
+                    "_"+pwrf.version+".png"
+    else:
+        outfile = None
+
+    #Everything needed to draw the figure - small enough to send to another process
+    frame = {"wpsfile": pwrf.wpsfile,\
+             "shapefile": os.getcwd()+'/countyl010g_shp_nt00964/countyl010g.shp',\
+             "bounds": domain_bounds(pwrf.lons, pwrf.lats),\
+             "title": "WRFv4 "+ pwrf.version +" Frontal Strength\nTime: "+\
+                      pwrf.wrf_dt[pwrf.time_idx].strftime("%Y-%m-%d %H:%M")+"Z",\
+             "lons": np.array(pwrf.lons[window]),\
+             "lats": np.array(pwrf.lats[window]),\
+             "gridded_data": np.array(gridded_data[window]),\
+             "threshold": pgrid.threshold,\
+             "lon_pts": np.array(lon_pts, dtype=float),\
+             "lat_pts": np.array(lat_pts, dtype=float),\
+             "outfile": outfile}
+
+    if pwrf.plot_queue is not None and outfile is not None:
+        pwrf.plot_queue.submit(frame)
+    else:
+        render_frame(frame)
+
+
+def render_frame(frame):
+    """render_frame: Draw (and save or show) one frame built by plot_data
+
+    Input:
+        frame -- (dict) data and labels for the figure
+    Output:
+        Optional: Save Figure
+        None
+    """
+    ## Projection, domain and counties - built once per run
+    context = get_plot_context(frame["wpsfile"], frame["bounds"], frame["shapefile"])
 
     ## SET UP PLOT
     fig1 = plt.figure(figsize=[8, 8], dpi=100)
-    ax1 = plt.axes(projection=wps.calc_wps_domain_info()[0]) #wpsproj - namelist.wps
+    ax1 = plt.axes(projection=context.wpsproj) #wpsproj - namelist.wps
 
-    ax1.set_title("WRFv4 "+ pwrf.version +" Frontal Strength\nTime: "+\
-                  pwrf.wrf_dt[pwrf.time_idx].strftime("%Y-%m-%d %H:%M")+"Z",\
-                  size=20)
+    ax1.set_title(frame["title"], size=20)
 
     #Plot the front threshold data (after it's been cleaned)
-    plt1 = plt.pcolormesh(pwrf.lons[pgrid.south_start:pgrid.north_end,\
-                                  pgrid.west_start:pgrid.east_end-pgrid.gradient_distance],\
-                        pwrf.lats[pgrid.south_start:pgrid.north_end,\
-                                  pgrid.west_start:pgrid.east_end-pgrid.gradient_distance],\
-                        gridded_data[pgrid.south_start:pgrid.north_end,\
-                                     pgrid.west_start:pgrid.east_end-pgrid.gradient_distance],\
-                        cmap='jet', vmin=pgrid.threshold, vmax=3, transform=ccrs.PlateCarree())
+    plt1 = plt.pcolormesh(frame["lons"], frame["lats"], frame["gridded_data"],\
+                        cmap='jet', vmin=frame["threshold"], vmax=3,\
+                        transform=ccrs.PlateCarree())
 
     plt1.cmap.set_under("white")
 
     #plot the front points
-    for ijk in range(len(lon_pts)):
-        ax1.plot(lon_pts[ijk], lat_pts[ijk], 'rp', markersize=4, transform=ccrs.PlateCarree())
+    for ijk in range(len(frame["lon_pts"])):
+        ax1.plot(frame["lon_pts"][ijk], frame["lat_pts"][ijk], 'rp', markersize=4,\
+                 transform=ccrs.PlateCarree())
 
     #Add map layers for counties/states/coastlines/etc.
-    try:
-        reader = shpreader.Reader(os.getcwd()+'/countyl010g_shp_nt00964/countyl010g.shp')
-        counties = list(reader.geometries())
-        obj_counties = cfeature.ShapelyFeature(counties, ccrs.PlateCarree())
-        ax1.add_feature(obj_counties, facecolor='none', edgecolor='darkslategray')
-    except ImportError:
-        ax1.add_feature(cartopy.feature.STATES.with_scale('10m'),\
-                          edgecolor='darkslategray', linewidth=1)
-        ax1.coastlines('10m', 'darkslategray', linewidth=1)
+    context.add_map_layers(ax1)
 
     # Set/Add colorbar
     cbar_ax = fig1.add_axes([0, 0, 0.1, 0.1])
@@ -73,10 +100,8 @@ def plot_data(pwrf, pgrid, gridded_data, lon_pts, lat_pts):
     cbar_ax.set_position([posn.x0 + posn.width + 0.01, posn.y0, 0.04, posn.height])
     plt.colorbar(plt1, cax=cbar_ax, extend='min')
 
-    if pwrf.save:
-        plt.savefig(pwrf.mappath+"/Frontal_Strength_Analysis_"+\
-                    pwrf.wrf_dt[pwrf.time_idx].strftime("%Y_%m_%d_%H%M")+\
-                    "_"+pwrf.version+".png", transparent=True, dpi=600)
+    if frame["outfile"] is not None:
+        plt.savefig(frame["outfile"], transparent=True, dpi=600)
     else:
         plt.show()
 
@@ -0,0 +1,79 @@
+"""Copyright (C) 2018-Present E. Allen, D. Moore, D. Veron - University of Delaware"""
+#
+# You may use, distribute and modify this code under the
+# terms of the GNU Lesser General Public License v3.0 license.
+#
+# https://www.gnu.org/licenses/lgpl-3.0.en.html
+#
+# Imports
+from __future__ import print_function
+import os
+import sys
+import multiprocessing
+import matplotlib.pyplot as plt
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src_model.plot_data import render_frame
+
+class PlotQueue:
+    """
+    Render and save plot_data figures in a pool of background processes (Agg backend)
+    so front detection can continue while matplotlib works.
+
+    At most max_pending frames are held at once; submit waits for the oldest frame
+    when the queue is full. Errors raised while rendering are raised again in the
+    caller by submit/flush/close.
+
+    Input:
+        processes (int) number of plotting processes
+        max_pending (int) maximum number of frames waiting or being rendered
+    Output:
+        class object
+    """
+    def __init__(self, processes=2, max_pending=8):
+        self.max_pending = max(max_pending, 1)
+        self.pending = []
+        self.pool = multiprocessing.Pool(processes, initializer=_init_plot_worker)
+
+    def submit(self, frame):
+        """submit: Queue one frame from plot_data"""
+        #Drop finished frames (raising their errors), then wait while the queue is full
+        self._collect()
+        while len(self.pending) >= self.max_pending:
+            self.pending.pop(0).get()
+        self.pending.append(self.pool.apply_async(render_frame, (frame,)))
+
+    def flush(self):
+        """flush: Wait until every queued frame has been saved (end of each case/version)"""
+        while self.pending:
+            self.pending.pop(0).get()
+
+    def close(self):
+        """close: Flush and shut down the plotting processes (end of a run that finished)"""
+        try:
+            self.flush()
+        except BaseException:
+            self.terminate()
+            raise
+        self.pool.close()
+        self.pool.join()
+
+    def terminate(self):
+        """terminate: Shut down the plotting processes without waiting for the queued frames
+
+        Used when detection fails - frames not saved yet are dropped and their errors are
+        not raised, so the error that stopped detection is the one reported.
+        """
+        self.pending = []
+        self.pool.terminate()
+        self.pool.join()
+
+    def _collect(self):
+        """Remove frames that are done, raising any error from rendering them"""
+        for result in [result for result in self.pending if result.ready()]:
+            self.pending.remove(result)
+            result.get()
+
+
+def _init_plot_worker():
+    """Plotting processes never open a window"""
+    plt.switch_backend('Agg')
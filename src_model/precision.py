@@ -0,0 +1,44 @@
+"""Copyright (C) 2018-Present E. Allen, D. Moore, D. Veron - University of Delaware"""
+#
+# You may use, distribute and modify this code under the
+# terms of the GNU Lesser General Public License v3.0 license.
+#
+# https://www.gnu.org/licenses/lgpl-3.0.en.html
+#
+# Imports
+from __future__ import print_function
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src_model.upscale import upscale_data
+from src_model.gradient import frontal_strength, threshold_data
+from src_model.detect_front import leading_edge
+from src_model.filter import filter_data
+
+def compare_precision(theta, grid, work, atol=1.0e-4):
+    """compare_precision: Run one time step through the float64 stages and the workspace stages
+
+    Input:
+        theta (2D array) theta at the analysis level
+        grid (class) AnalysisGrid
+        work (class) Workspace (e.g. float32)
+        atol (float) largest allowed frontal strength difference
+    Output:
+        max_diff (float) largest frontal strength difference
+        rows_diff (int) rows where the leading edge is not the same
+        within (bool) max_diff <= atol
+    """
+    results = []
+    for stage_work in (None, work):
+        data = theta if stage_work is None else theta.astype(stage_work.dtype)
+        gradient = frontal_strength(upscale_data(data, grid, work=stage_work), grid,\
+                                    work=stage_work)
+        filtered = filter_data(threshold_data(gradient, grid, work=stage_work), grid)
+        foundidx, found = leading_edge(filtered, grid)
+        results.append((gradient.astype(np.float64), np.where(found, foundidx, -1)))
+
+    max_diff = float(np.nanmax(np.abs(results[0][0] - results[1][0])))
+    rows_diff = int(np.sum(results[0][1] != results[1][1]))
+
+    return max_diff, rows_diff, max_diff <= atol
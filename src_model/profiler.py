@@ -0,0 +1,139 @@
+"""Copyright (C) 2018-Present E. Allen, D. Moore, D. Veron - University of Delaware"""
+#
+# You may use, distribute and modify this code under the
+# terms of the GNU Lesser General Public License v3.0 license.
+#
+# https://www.gnu.org/licenses/lgpl-3.0.en.html
+#
+# Imports
+from __future__ import print_function
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+PROFILE_COLUMNS = ["CASE", "VERSION", "TIME_STEP", "STAGE", "SECONDS", "PEAK_MB"]
+
+class StageProfiler:
+    """
+    Wall time and peak memory of each stage of the front detection
+    (open, read, theta, upscale, gradient, filter, detect, save, plot).
+
+    Peak memory is the largest amount of memory (MB) allocated by Python/numpy
+    during the stage on top of what was allocated when it started (tracemalloc).
+
+    Input:
+        memory (bool) also record peak memory (slower)
+    Output:
+        class object
+    """
+    def __init__(self, memory=True):
+        self.records = []
+        self.case = None
+        self.version = None
+        self.memory = memory
+        self.started_tracing = memory and not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start()
+
+    def set_run(self, case, version):
+        """set_run: case/version the next stages belong to"""
+        self.case = case
+        self.version = version
+
+    @contextmanager
+    def stage(self, name, time_step=None):
+        """stage: Time the code in a with block
+
+        Input:
+            name (string) stage name
+            time_step (int) time index (None = all time steps / whole run)
+        """
+        if self.memory:
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            if self.memory:
+                peak = (tracemalloc.get_traced_memory()[1] - start_memory) / 1.0e6
+            else:
+                peak = np.nan
+            self.records.append((self.case, self.version, time_step, name, seconds, peak))
+
+    def to_frame(self, case=None, version=None):
+        """to_frame: (DataFrame) records, only those of case/version when given"""
+        frame = pd.DataFrame(self.records, columns=PROFILE_COLUMNS)
+        #Blank time step = stage covering all time steps / the whole run
+        frame["TIME_STEP"] = frame["TIME_STEP"].astype("Int64")
+        if case is not None:
+            frame = frame[(frame["CASE"] == case) & (frame["VERSION"] == version)]
+        return frame
+
+    def save(self, datapath, case_time):
+        """save: Write the records of the current case/version to PROFILE_<case>_<version>.csv
+
+        Input:
+            datapath (string) output directory of the model run
+            case_time (string) formatted case time
+        """
+        self.to_frame(self.case, self.version).to_csv(\
+            os.path.join(datapath, "PROFILE_"+case_time.replace("-", "_")+"_"+\
+                         self.version+".csv"), index=False)
+
+    def print_summary(self):
+        """print_summary: Time and peak memory of each stage over all cases/versions"""
+        frame = self.to_frame()
+        if frame.empty:
+            return
+
+        stages = frame.groupby("STAGE", sort=False).agg(CALLS=("SECONDS", "size"),\
+                                                        TOTAL_S=("SECONDS", "sum"),\
+                                                        MEAN_S=("SECONDS", "mean"),\
+                                                        PEAK_MB=("PEAK_MB", "max"))
+        stages["PERCENT"] = np.round(stages["TOTAL_S"] / stages["TOTAL_S"].sum() * 100, 1)
+        runs = frame.groupby(["CASE", "VERSION"], sort=False)["SECONDS"].sum()
+
+        print("Stage Timing:")
+        print("-------------")
+        print(stages.round(4).to_string())
+        print()
+        print("Seconds per Case/Version:")
+        print(runs.round(2).to_string())
+        print()
+        print()
+
+    def close(self):
+        """close: Stop tracing memory (if this profiler started it)"""
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+
+class _NoStage:
+    """Stand-in for StageProfiler.stage when profiling is off"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+_NO_STAGE = _NoStage()
+
+def stage(profiler, name, time_step=None):
+    """stage: profiler.stage(name, time_step), or a no-op when profiler is None
+
+    Input:
+        profiler (class) StageProfiler or None
+        name (string) stage name
+        time_step (int) time index (None = all time steps / whole run)
+    Output:
+        context manager
+    """
+    if profiler is None:
+        return _NO_STAGE
+    return profiler.stage(name, time_step)
@@ -0,0 +1,136 @@
+"""Copyright (C) 2018-Present E. Allen, D. Moore, D. Veron - University of Delaware"""
+#
+# You may use, distribute and modify this code under the
+# terms of the GNU Lesser General Public License v3.0 license.
+#
+# https://www.gnu.org/licenses/lgpl-3.0.en.html
+#
+# Imports
+from __future__ import print_function
+import os
+import sys
+import itertools
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src_model.upscale import upscale_data
+from src_model.gradient import frontal_strength, threshold_data
+from src_model.detect_front import leading_edge
+from src_model.filter import filter_data
+from src_model.find_front import front_characteristics
+from src_model.workspace import Workspace
+from commonclass.ModelData import ModelData
+from commonclass.DiagnosticCache import open_cache
+
+SWEEP_COLUMNS = ["TIME", "CELL_SIZE", "GRADIENT_DISTANCE", "THRESHOLD", "FILTER_AREA",\
+                 "FOUND", "PERCENTAGE", "LENGTH"]
+
+def sweep_driver(grid, detection_info, sweep):
+    """sweep_driver: Detection statistics for every combination of AnalysisGrid parameters
+
+    Theta is read once per case/version. The upscaled theta is calculated once per
+    cell_size and the frontal strength once per gradient_distance; only the threshold,
+    filter and leading edge stages run for every combination. Nothing is plotted and
+    the 2D fields are not saved.
+
+    Input:
+        grid (class) instance of AnalysisGrid (parameters not in sweep are kept)
+        detection_info (class) instance of DetectionInfo
+        sweep (dict) lists of values, keys: "cell_size", "gradient_distance",
+                     "threshold", "filter_area"
+    Output:
+        None
+        csv file for each case/version with one row per combination and time step.
+    """
+    grid.print_info()
+
+    detection_info.print_info()
+
+    for case in detection_info.casestudy_times:
+        for ivar in detection_info.independent_variables:
+
+            wrf_data = ModelData(case=case, version=ivar, var=detection_info.variable,\
+                                 domain=detection_info.domain,\
+                                 path=detection_info.data_directory, lazy=True,\
+                                 cache=open_cache(detection_info.cache_directory,\
+                                                  detection_info.cache_max_gb))
+            if detection_info.precision == "float32":
+                wrf_data.set_workspace(Workspace(np.float32))
+
+            wrf_data.set_datapath(os.path.join(os.getcwd(), 'Data', "Model_Data", "Fronts",\
+                                               wrf_data.case_time.replace("-", "_"),\
+                                               wrf_data.version))
+
+            stats = parameter_sweep(wrf_data, grid, sweep)
+            print(ivar, ":: Combinations: ", len(stats)//len(wrf_data.wrf_dt),\
+                  "  |||  Fronts Found: ", int(stats["FOUND"].sum()))
+            sys.stdout.flush()
+
+            if detection_info.save_results:
+                stats.to_csv(os.path.join(wrf_data.datapath, "SWEEP_"+\
+                                          wrf_data.case_time.replace("-", "_")+"_"+\
+                                          wrf_data.version+".csv"), index=False)
+
+
+def parameter_sweep(wrf1, grid1, sweep):
+    """parameter_sweep: Detection statistics of one model run for every parameter combination
+
+    The grid is changed while the sweep runs and restored afterwards.
+
+    Input:
+        wrf1 (class) ModelData
+        grid1 (class) AnalysisGrid
+        sweep (dict) lists of values for "cell_size", "gradient_distance",
+                     "threshold", "filter_area" (missing keys keep the grid value)
+    Output:
+        stats (DataFrame) one row per combination and time step (SWEEP_COLUMNS)
+    """
+    saved = (grid1.cell_size, grid1.gradient_distance, grid1.threshold, grid1.filter_area)
+    cell_sizes = sweep.get("cell_size", [grid1.cell_size])
+    gradient_distances = sweep.get("gradient_distance", [grid1.gradient_distance])
+    thresholds = sweep.get("threshold", [grid1.threshold])
+    filter_areas = sweep.get("filter_area", [grid1.filter_area])
+
+    times = [time.strftime("%m%d%Y_%H%M") for time in wrf1.wrf_dt]
+    rows = np.arange(grid1.south_start, grid1.north_end)
+    work = wrf1.workspace
+    results = []
+    try:
+        #Read theta once - the window of the largest nugget covers all the others
+        grid1.set_cell_size(max(cell_sizes))
+        theta = wrf1.get_level_data(grid1.level, grid1.get_read_window(), all_times=True,\
+                                    work=work)
+
+        for cell_size in cell_sizes:
+            grid1.set_cell_size(cell_size)
+            grid1.set_nuggetsize()
+            data_fill = upscale_data(theta, grid1, work=work)
+
+            for gradient_distance in gradient_distances:
+                grid1.set_gradient_distance(gradient_distance)
+                front_threshold = frontal_strength(data_fill, grid1, work=work)
+
+                for threshold, filter_area in itertools.product(thresholds, filter_areas):
+                    grid1.set_threshold(threshold)
+                    grid1.set_filterarea(filter_area)
+
+                    #filter_data works in place
+                    filtered_data = filter_data(threshold_data(front_threshold, grid1,\
+                                                               work=work), grid1)
+                    foundidx, found_pts = leading_edge(filtered_data, grid1)
+                    lon_pts = np.where(found_pts, wrf1.lons[rows, foundidx], np.nan)
+
+                    found, ratio_pts, len_long_seq = front_characteristics(lon_pts)
+                    results.extend(zip(times, itertools.repeat(cell_size),\
+                                       itertools.repeat(gradient_distance),\
+                                       itertools.repeat(threshold),\
+                                       itertools.repeat(filter_area),\
+                                       found, ratio_pts, len_long_seq))
+    finally:
+        grid1.set_cell_size(saved[0])
+        grid1.set_nuggetsize()
+        grid1.set_gradient_distance(saved[1])
+        grid1.set_threshold(saved[2])
+        grid1.set_filterarea(saved[3])
+
+    return pd.DataFrame(results, columns=SWEEP_COLUMNS)
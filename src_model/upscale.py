@@ -0,0 +1,79 @@
+"""Copyright (C) 2018-Present E. Allen, D. Moore, D. Veron - University of Delaware"""
+#
+# You may use, distribute and modify this code under the
+# terms of the GNU Lesser General Public License v3.0 license.
+#
+# https://www.gnu.org/licenses/lgpl-3.0.en.html
+#
+# Imports
+from __future__ import print_function
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src_model.get_values_loc import get_values_loc2
+from src_model.workspace import full
+
+def upscale_data(data_in, grid, work=None):
+    """upscale_data: Average theta over every nugget in the AnalysisGrid box at once
+
+    Same result as upscale_data_reference. The window sums are accumulated in the
+    same order and in the same precision as get_values_loc2 (the dtype of data_in,
+    at least float64 for integers), so the two agree bit-for-bit with NumPy 2. With
+    NumPy 1 get_values_loc2 sums float32 input in float64 and the two differ by
+    float32 rounding. Leading dimensions (e.g. time or level) are carried through.
+
+    Input:
+        data_in (array) theta values (..., south_north, west_east)
+        grid (class) AnalysisGrid
+        work (class) Workspace for the sums and the output (None = new arrays)
+    Output:
+        data_fill (array) upscaled theta values, NaN outside of the nuggets
+    """
+    size = grid.cell_size
+    lat_centers = np.arange(grid.south_start, grid.north_end, size)
+    lon_centers = np.arange(grid.west_start, grid.east_end, size)
+
+    #Sum each nugget (west-east offset outer, north-south offset inner)
+    sum_values = full(work, "nugget_sum",\
+                      data_in.shape[:-2] + (len(lat_centers), len(lon_centers)), 0.0,\
+                      dtype=np.result_type(data_in, 0.0))
+    for i in range(-size, size+1):
+        for j in range(-size, size+1):
+            sum_values += data_in[..., lat_centers[:, None]+j, lon_centers[None, :]+i]
+    nugget_mean = np.divide(sum_values, (2*size + 1)**2, out=sum_values)
+
+    #Later nuggets overwrite the overlap with earlier ones, so each cell takes the
+    #value of the last nugget that covers it.
+    rows = np.arange(lat_centers[0]-size, lat_centers[-1]+size+1)
+    cols = np.arange(lon_centers[0]-size, lon_centers[-1]+size+1)
+    row_nugget = np.minimum((rows - lat_centers[0] + size) // size, len(lat_centers)-1)
+    col_nugget = np.minimum((cols - lon_centers[0] + size) // size, len(lon_centers)-1)
+
+    data_fill = full(work, "data_fill", data_in.shape, np.nan)
+    data_fill[..., rows[:, None], cols[None, :]] =\
+                nugget_mean[..., row_nugget[:, None], col_nugget[None, :]]
+
+    return data_fill
+
+
+def upscale_data_reference(data_in, grid):
+    """upscale_data_reference: Original nugget loop, kept to cross-check upscale_data
+
+    Input:
+        data_in (2D-array) theta values for a single model level
+        grid (class) AnalysisGrid
+    Output:
+        data_fill (2D-array) upscaled theta values, NaN outside of the nuggets
+    """
+    data_fill = np.full(data_in.shape, np.nan)
+
+    #Fill the array with calculations of theta
+    for ilat in range(grid.south_start, grid.north_end, grid.cell_size):
+        for jlon in range(grid.west_start, grid.east_end, grid.cell_size):
+            theta = get_values_loc2(data_in, grid.cell_size, ilat, jlon)
+            for idx2 in range(-grid.cell_size, grid.cell_size+1):
+                for jdx2 in range(-grid.cell_size, grid.cell_size+1):
+                    data_fill[ilat+idx2, jlon+jdx2] = theta
+
+    return data_fill
@@ -0,0 +1,55 @@
+"""Copyright (C) 2018-Present E. Allen, D. Moore, D. Veron - University of Delaware"""
+#
+# You may use, distribute and modify this code under the
+# terms of the GNU Lesser General Public License v3.0 license.
+#
+# https://www.gnu.org/licenses/lgpl-3.0.en.html
+#
+# Imports
+from __future__ import print_function
+import numpy as np
+
+class Workspace:
+    """
+    Work arrays for the front detection stages, allocated once and reused every
+    time step (reallocated only when a shape changes). All arrays have the
+    workspace dtype, so float32 halves the memory of every intermediate grid.
+
+    An array from the workspace is overwritten the next time the same stage runs;
+    copy anything that has to be kept.
+
+    Input:
+        dtype (numpy dtype) precision of the work arrays
+    Output:
+        class object
+    """
+    def __init__(self, dtype=np.float32):
+        self.dtype = np.dtype(dtype)
+        self.arrays = {}
+
+    def get(self, name, shape):
+        """get: Work array (uninitialized) for name with this shape"""
+        array = self.arrays.get(name)
+        if array is None or array.shape != tuple(shape):
+            array = np.empty(shape, dtype=self.dtype)
+            self.arrays[name] = array
+        return array
+
+
+def full(work, name, shape, value, dtype=None):
+    """full: np.full(shape, value), from the workspace when work is not None
+
+    Input:
+        work (class) Workspace or None (new array)
+        name (string) work array name
+        shape (tuple) array shape
+        value (float) fill value
+        dtype (numpy dtype) of the new array when work is None (None = float64)
+    Output:
+        (array)
+    """
+    if work is None:
+        return np.full(shape, value, dtype=dtype)
+    array = work.get(name, shape)
+    array.fill(value)
+    return array
@@ -0,0 +1,281 @@
+"""Copyright (C) 2018-Present E. Allen, D. Veron - University of Delaware"""
+#
+# You may use, distribute and modify this code under the
+# terms of the GNU Lesser General Public License v3.0 license.
+#
+# https://www.gnu.org/licenses/lgpl-3.0.en.html
+#
+# Cross-check of the station stencil path on a small synthetic wrfout:
+#
+#     python src_sfc_stats/check_station_points.py
+#
+# 1) ModelData.get_station_data (StationPoints) against the full fields from
+#    ModelData.get_wrf_data at every point of every stencil. Stencil points off the grid
+#    must be NaN.
+# 2) get_values_stencil against get_values_loc for both analysis types. Stations inside
+#    the domain must agree exactly. At the edge get_values_loc does not leave the points
+#    off the grid out (index -1 wraps around to the other side of the grid and an index
+#    past the last row/column raises IndexError), so there get_values_stencil is compared
+#    with the average of the points inside the domain with the same land type and the
+#    get_values_loc result is only reported.
+#
+# Exits with 1 if anything disagrees.
+#
+# Imports
+from __future__ import print_function
+import os
+import sys
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+import numpy as np
+from netCDF4 import Dataset
+import wrf
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from commonclass.ModelData import ModelData
+from src_sfc_stats.get_values_loc import get_values_loc, get_values_stencil
+
+CASE = "2014-06-03_12:00"
+VERSION = "CHECK"
+DOMAIN = "03"
+
+VARIABLES = ['Air_Temperature (K)', 'Dewpoint_Temperature (K)', 'Relative Humidity (%)',\
+             'Pressure (Pa)', 'theta', 'U10', 'V10', 'Wind_Speed (m/s)',\
+             'Wind_Direction (deg)', 'LANDMASK']
+
+#(south_north, west_east) - interior, edges and corners of a 12 x 10 grid
+POINTS = [(5, 4), (6, 6), (0, 3), (4, 0), (11, 5), (7, 9), (0, 0), (11, 9)]
+
+GRAVITY = 9.81
+
+
+def write_wrfout(path, ntimes=3, nz=8, ny=12, nx=10, seed=0):
+    """write_wrfout: Small synthetic Lambert conformal wrfout with the variables ModelData uses
+
+    The values are random but physically plausible (pressure falls with height, moist
+    air near the surface) so the wrf-python diagnostics run on them.
+
+    Input:
+        path (string) model data directory (the CaseStudy directories are made in it)
+        ntimes, nz, ny, nx (int) size of the Time, bottom_top, south_north, west_east
+        seed (int) random seed
+    Output:
+        filename (string) wrfout written
+    """
+    start = datetime.strptime(CASE, "%Y-%m-%d_%H:%M")
+    short_time = start.strftime('%-m-%-d-%Y')
+    directory = os.path.join(path, "CaseStudy_"+short_time,\
+                             VERSION+"_"+short_time.replace("-", "_"))
+    os.makedirs(directory)
+    filename = os.path.join(directory, "wrfout_d"+DOMAIN+"_"+\
+                            start.strftime("%Y-%m-%d_%H:%M:%S"))
+    rng = np.random.default_rng(seed)
+
+    #Heights of the staggered levels (m) - the terrain is low so all levels are above it
+    hgt = rng.uniform(0., 50., (ny, nx))
+    z_stag = hgt[None] + np.linspace(0., 4000., nz+1)[:, None, None]
+    z_mass = 0.5*(z_stag[1:] + z_stag[:-1])
+
+    with Dataset(filename, "w") as ncfile:
+        ncfile.createDimension("Time", None)
+        ncfile.createDimension("DateStrLen", 19)
+        ncfile.createDimension("bottom_top", nz)
+        ncfile.createDimension("bottom_top_stag", nz+1)
+        ncfile.createDimension("south_north", ny)
+        ncfile.createDimension("west_east", nx)
+        ncfile.setncatts({"MAP_PROJ": 1, "TRUELAT1": 30., "TRUELAT2": 60.,\
+                          "STAND_LON": -75., "CEN_LAT": 39., "CEN_LON": -75.,\
+                          "MOAD_CEN_LAT": 39., "POLE_LAT": 90., "POLE_LON": 0.,\
+                          "DX": 3000., "DY": 3000.})
+
+        times = ncfile.createVariable("Times", "S1", ("Time", "DateStrLen"))
+        for idx in range(ntimes):
+            stamp = (start + timedelta(hours=idx)).strftime("%Y-%m-%d_%H:%M:%S")
+            times[idx] = np.array(list(stamp), dtype="S1")
+
+        def add(name, dims, data):
+            """Write one float32 variable"""
+            ncfile.createVariable(name, "f4", dims)[:] = data
+
+        sfc = ("Time", "south_north", "west_east")
+        mass = ("Time", "bottom_top", "south_north", "west_east")
+        stag = ("Time", "bottom_top_stag", "south_north", "west_east")
+        shape = (ntimes, ny, nx)
+
+        lats = 39. + 0.027*(np.arange(ny) - ny//2)
+        lons = -75. + 0.035*(np.arange(nx) - nx//2)
+        add("XLAT", sfc, np.broadcast_to(lats[None, :, None], shape))
+        add("XLONG", sfc, np.broadcast_to(lons[None, None, :], shape))
+        add("HGT", sfc, np.broadcast_to(hgt, shape))
+        add("LANDMASK", sfc, np.broadcast_to(rng.integers(0, 2, (ny, nx)), shape))
+        add("T2", sfc, rng.normal(295., 2., shape))
+        add("PSFC", sfc, rng.normal(101000., 300., shape))
+        add("Q2", sfc, rng.uniform(0.008, 0.016, shape))
+        add("U10", sfc, rng.normal(0., 5., shape))
+        add("V10", sfc, rng.normal(0., 5., shape))
+
+        #Hydrostatic-ish profile with a scale height of 8 km
+        pressure = 101000.*np.exp(-z_mass/8000.)
+        add("PB", mass, np.broadcast_to(pressure, (ntimes,)+pressure.shape))
+        add("P", mass, rng.normal(0., 50., (ntimes,)+pressure.shape))
+        add("T", mass, 2. + 0.004*z_mass + rng.normal(0., 0.5, (ntimes,)+pressure.shape))
+        add("QVAPOR", mass, 0.01*np.exp(-z_mass/3000.) *\
+                             rng.uniform(0.8, 1.2, (ntimes,)+pressure.shape))
+        add("PHB", stag, np.broadcast_to(GRAVITY*z_stag, (ntimes,)+z_stag.shape))
+        add("PH", stag, rng.normal(0., 1., (ntimes,)+z_stag.shape))
+    return filename
+
+
+def check_stencils(wrf_data, points, rtol=1e-5):
+    """check_stencils: get_station_data against the full fields at every stencil point
+
+    Input:
+        wrf_data (ModelData) opened with var=None
+        points (list) (south_north, west_east) grid index of each station
+        rtol (float) allowed difference relative to the largest value of the field
+    Output:
+        failures (int) number of variables that disagree
+    """
+    _, station_data = wrf_data.get_station_data(points, VARIABLES)
+    ny, nx = wrf_data.lats.shape
+    failures = 0
+    for variable in VARIABLES:
+        wrf_data.get_wrf_data(variable)
+        full = np.ma.getdata(np.asarray(wrf_data.wrf_var), subok=False).astype(np.float64)
+        stencils = station_data[variable].astype(np.float64)
+        worst = 0.
+        nan_ok = True
+        for idx, (y_pt, x_pt) in enumerate(points):
+            for j in range(-1, 1+1):
+                for i in range(-1, 1+1):
+                    got = stencils[..., idx, j+1, i+1]
+                    if not (0 <= y_pt+j < ny and 0 <= x_pt+i < nx):
+                        nan_ok = nan_ok and bool(np.all(np.isnan(got)))
+                        continue
+                    diff = np.abs(got - full[..., y_pt+j, x_pt+i])
+                    if variable == 'Wind_Direction (deg)':
+                        diff = np.minimum(diff, 360. - diff)
+                    worst = max(worst, float(np.max(diff)))
+        scale = max(float(np.max(np.abs(full))), 1.)
+        passed = nan_ok and worst <= rtol*scale
+        failures += not passed
+        print("%-26s max difference %.3g (%.2g relative)%s %s" % (variable, worst,\
+              worst/scale, "" if nan_ok else ", off-grid points not NaN",\
+              "ok" if passed else "FAILED"))
+    wrf_data.clear_wrf_var()
+    return failures
+
+
+def check_values_loc(wrf_data, points, variable='Air_Temperature (K)'):
+    """check_values_loc: get_values_stencil against get_values_loc at each time step
+
+    Input:
+        wrf_data (ModelData) opened with var=None
+        points (list) (south_north, west_east) grid index of each station
+        variable (string) valid variable name
+    Output:
+        failures (int) number of station/time/analysis type results that disagree
+    """
+    _, station_data = wrf_data.get_station_data(points, [variable, 'LANDMASK'])
+    wrf_data.get_wrf_data(variable)
+    full = np.ma.getdata(np.asarray(wrf_data.wrf_var), subok=False)
+    wrf_data.clear_wrf_var()
+    wrf_data.get_landmask()
+    ny, nx = wrf_data.lats.shape
+    failures = 0
+    for idx, (y_pt, x_pt) in enumerate(points):
+        lat_lon = wrf.xy_to_ll(wrf_data.ncfile, x_pt, y_pt, meta=False)
+        x_y = wrf.ll_to_xy(wrf_data.ncfile, lat_lon[0], lat_lon[1], meta=False)
+        if (int(x_y[1]), int(x_y[0])) != (y_pt, x_pt):
+            print("Station", (y_pt, x_pt), "does not round trip through ll_to_xy", x_y)
+            failures += 1
+            continue
+        interior = 0 < y_pt < ny-1 and 0 < x_pt < nx-1
+        notes = set()
+        station_failures = failures
+        for time_step in range(full.shape[0]):
+            landmask = wrf_data.get_landmask_step(time_step)
+            land_type = landmask[y_pt, x_pt]
+            for analysis_type in (True, False):
+                stencil = get_values_stencil(station_data[variable][time_step, idx],\
+                                             station_data['LANDMASK'][time_step, idx],\
+                                             land_type, analysis_type=analysis_type)
+                try:
+                    loc = get_values_loc(wrf_data.ncfile, full[time_step], landmask,\
+                                         land_type, lat_lon[0], lat_lon[1],\
+                                         analysis_type=analysis_type)
+                except IndexError:
+                    loc = "IndexError"
+                if interior:
+                    expected = loc
+                else:
+                    expected = in_domain_average(full[time_step], landmask, land_type,\
+                                                 y_pt, x_pt, analysis_type)
+                    if loc != expected:
+                        notes.add("get_values_loc %s" % ("raises IndexError"\
+                                  if loc == "IndexError" else "wraps around the grid"))
+                if stencil != expected:
+                    print("Station", (y_pt, x_pt), "time", time_step, "analysis_type",\
+                          analysis_type, "stencil", stencil, "expected", expected, "FAILED")
+                    failures += 1
+        print("Station %-8s %-8s %s%s" % (str((y_pt, x_pt)),\
+              "interior" if interior else "edge",\
+              "ok" if failures == station_failures else "FAILED",\
+              "" if not notes else " ("+", ".join(sorted(notes))+")"))
+    return failures
+
+
+def in_domain_average(wrf_var, landmask, land_type, y_pt, x_pt, analysis_type=True):
+    """in_domain_average: get_values_loc with the points off the grid left out
+
+    Input:
+        wrf_var (array) (south_north, west_east) values at one time step
+        landmask (array) (south_north, west_east) LANDMASK at the same time step
+        land_type (float) land type of the station
+        y_pt, x_pt (int) grid index of the station
+        analysis_type (bool) True = value at the point, False = average of the 3x3
+    Output:
+        value at the station (None if no point has the same land type)
+    """
+    if analysis_type:
+        return wrf_var[y_pt, x_pt]
+    sum_values = 0.0
+    num_values = 0
+    for i in range(-1, 1+1):
+        for j in range(-1, 1+1):
+            if 0 <= y_pt+j < wrf_var.shape[0] and 0 <= x_pt+i < wrf_var.shape[1] and\
+               land_type == landmask[y_pt+j, x_pt+i]:
+                sum_values += wrf_var[y_pt+j, x_pt+i]
+                num_values += 1
+    if num_values == 0:
+        return None
+    return sum_values/num_values
+
+
+def check_station_points(directory=None):
+    """check_station_points: Write the synthetic wrfout and run both checks on it
+
+    Input:
+        directory (string) where the wrfout is written (None = temporary, removed after)
+    Output:
+        (bool) True if everything agrees
+    """
+    path = tempfile.mkdtemp() if directory is None else directory
+    try:
+        write_wrfout(path)
+        wrf_data = ModelData(CASE, VERSION, None, DOMAIN, path)
+        print("get_station_data vs get_wrf_data")
+        failures = check_stencils(wrf_data, POINTS)
+        print("get_values_stencil vs get_values_loc")
+        failures += check_values_loc(wrf_data, POINTS)
+        wrf_data.ncfile.close()
+        wrf_data.clear_ncfile()
+    finally:
+        if directory is None:
+            shutil.rmtree(path, ignore_errors=True)
+    print("All checks passed" if failures == 0 else str(failures)+" checks FAILED")
+    return failures == 0
+
+
+if __name__ == '__main__':
+    sys.exit(0 if check_station_points() else 1)
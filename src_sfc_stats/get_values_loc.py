@@ -55,3 +55,28 @@ def get_values_loc(ncfile, wrf_var, landmask, land_type, latitude, longitude, an
         if num_values == 0:
             return None
         return sum_values/num_values
+
+
+def get_values_stencil(wrf_var, landmask, land_type, analysis_type=True):
+    """WRF VARIABLE AT ONE LOCATION FROM THE STENCIL AROUND IT
+
+    Same as get_values_loc, with the values and LANDMASK of the points around the
+    station already read by ModelData.get_station_data (the station in the middle).
+    """
+    halo = wrf_var.shape[-1]//2
+    if analysis_type:
+        #Value at the point
+        return wrf_var[halo, halo]
+
+    sum_values = 0.0
+    num_values = 0
+    #Same order as get_values_loc: west-east outer, north-south inner
+    for i in range(wrf_var.shape[1]):
+        for j in range(wrf_var.shape[0]):
+            #Off the grid (NaN) is never the same land type
+            if land_type == landmask[j, i]:
+                sum_values += wrf_var[j, i]
+                num_values += 1
+    if num_values == 0:
+        return None
+    return sum_values/num_values
@@ -0,0 +1,45 @@
+"""Copyright (C) 2018-Present E. Allen, D. Veron - University of Delaware"""
+#
+# You may use, distribute and modify this code under the
+# terms of the GNU Lesser General Public License v3.0 license.
+#
+# https://www.gnu.org/licenses/lgpl-3.0.en.html
+#
+# Imports
+from __future__ import print_function
+import numpy as np
+
+def match_times(wrf_times, obs_times, analysis_start, analysis_end, lead_time, wrf_substeps):
+    """
+    Observations valid at each WRF time step (+ lead_time) in the analysis window.
+
+    The observation times are sorted once and every WRF time step is looked up
+    with a binary search instead of comparing it to every observation.
+
+    (array) wrf_times: ModelData.wrf_dt64
+    (array) obs_times: ObsData.t_time (datetime64)
+    (datetime) analysis_start, analysis_end: StatConfig analysis window
+    (timedelta) lead_time: lead-lag shift of the observations
+    (int) wrf_substeps: every wrf_substeps WRF time step is analyzed
+
+    Yields (j, rows): WRF time index and the matching observation rows (file order)
+    """
+    wrf_times = np.asarray(wrf_times, dtype="datetime64[us]")
+    obs_times = np.asarray(obs_times, dtype="datetime64[us]")
+    start = np.datetime64(analysis_start, "us")
+    end = np.datetime64(analysis_end, "us")
+    lead = np.timedelta64(lead_time, "us")
+
+    #Stable: rows with the same time stay in file order
+    order = np.argsort(obs_times, kind="stable")
+    sorted_times = obs_times[order]
+
+    for j in range(0, len(wrf_times), wrf_substeps):
+        #WRF Data outside analysis window (the observations at wrf time + lead are too)
+        if wrf_times[j] < start or wrf_times[j] > end:
+            continue
+
+        first = np.searchsorted(sorted_times, wrf_times[j]+lead, side="left")
+        last = np.searchsorted(sorted_times, wrf_times[j]+lead, side="right")
+        if last > first:
+            yield j, order[first:last]
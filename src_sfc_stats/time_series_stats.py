@@ -29,12 +29,14 @@ import pandas as pd
 import numpy as np
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from src_sfc_stats.getmetrics import getmetrics
-from src_sfc_stats.get_land_value import get_land_value
-from src_sfc_stats.get_values_loc import get_values_loc
+from src_sfc_stats.get_values_loc import get_values_stencil
 from src_sfc_stats.get_substeps import get_substeps
+from src_sfc_stats.match_times import match_times
 from src_sfc_stats.print_info import print_table, print_bad_output
 from src_sfc_stats.plot_timeseries import make_plot
-from commonclass.ModelData import ModelData
+from commonclass.ModelPool import ModelPool
+from commonclass.DiagnosticCache import open_cache
+from commonclass.StationIndex import StationIndex
 import src_sfc_stats.alt_stats as astat
 
 def model_analysis_timeseries(stats, obs):
@@ -90,6 +92,11 @@ def model_analysis_timeseries(stats, obs):
 
     stats.print_info()
 
+    #Model runs stay open between variables (and versions) - see ModelPool
+    pool = ModelPool(stats.get_model_pool_size(), stats.data_directory,\
+                     cache=open_cache(stats.cache_directory, stats.cache_max_gb))
+    #Station grid points - found once per domain (kept with the cache)
+    station_index = StationIndex(stats.cache_directory)
 
     for variable in stats.variables:
 
@@ -145,11 +152,11 @@ def model_analysis_timeseries(stats, obs):
                 preds_array = np.empty(length_count)
 
                 # For each WRF domain in analysis get that data file and read it. If Empty->EXIT
-                wrf_data = ModelData(case=case_time, version=ind_var, var=variable,\
-                                 domain=stats.domain, path=stats.data_directory)
+                #Opened without reading a field - only the stations are read (below)
+                wrf_data = pool.get(case_time, ind_var, stats.domain, None)
 
                 #Remove any observations outside of the domain
-                obs.remove_data_outside(wrf_data.ncfile)
+                obs.remove_data_outside(wrf_data.lats, wrf_data.lons)
 
                 #Extract the WRF variable for analysis
                 #wrf_var = get_wrf_data(ncfile, variable)
@@ -160,6 +167,18 @@ def model_analysis_timeseries(stats, obs):
                 #Get observation data
                 obs.get_obs_data(variable)
 
+                #Grid point and land type of every observation (no ll_to_xy in the loop)
+                x_y, station_land = station_index.locate(wrf_data, obs.id_string,\
+                                                         obs.obs_lat_list, obs.obs_lon_list)
+
+                #Model values only at the 3x3 grid points around each station, in the
+                #analysis window (I/O scales with the stations, not the domain)
+                points, column = np.unique(x_y[::-1].T, axis=0, return_inverse=True)
+                column = column.reshape(-1)
+                steps, station = wrf_data.get_station_data(points, [variable, "LANDMASK"],\
+                                                           time_window=(stats.analysis_start,\
+                                                                        stats.analysis_end))
+
 
 
                 # Plus two because extra first and extra last when all are averaged.
@@ -180,21 +199,11 @@ def model_analysis_timeseries(stats, obs):
                 ## FOCUS ON 8am to 8pm so 12UTC to 0UTC
                 ## CHANGED TO 6am to midnight that way it captures sunrise and sunset and after SB.
                 lastJ = 0
-                for j in range(0, len(wrf_data.wrf_dt), wrf_substeps):
+                for j, rows in match_times(wrf_data.wrf_dt64, obs.t_time, stats.analysis_start,\
+                                           stats.analysis_end, lead_time, wrf_substeps):
                     #Checks every half hour and 30 minutes
-                    len0 = 0
-                    for i in range(len0, len(obs.obs_data)):
-                        #Observation Data outside analysis window
-                        if obs.t_time[i] < stats.analysis_start+lead_time or\
-                                    obs.t_time[i] > stats.analysis_end+lead_time:
-                            len0 = i
-                        #WRF Data outside analysis window
-                        elif wrf_data.wrf_dt[j] < stats.analysis_start or\
-                                wrf_data.wrf_dt[j] > stats.analysis_end:
-                            continue
-
-                        elif (np.isnan(obs.obs_lat_list[i]) or np.isnan(obs.obs_lon_list[i])) and\
-                                obs.t_time[i] == wrf_data.wrf_dt[j]+lead_time:
+                    for i in rows:
+                        if np.isnan(obs.obs_lat_list[i]) or np.isnan(obs.obs_lon_list[i]):
                             # For Eric's purposes the CMLF is often missing lat and long
                             # Nothing else should. So let me know if there is....
                             if obs.id_string[i] != "CMLF":
@@ -221,11 +230,13 @@ def model_analysis_timeseries(stats, obs):
                             count += 1
                             continue
                         ## Correct obs.t_time - MATCH!
-                        elif obs.t_time[i] == wrf_data.wrf_dt[j]+lead_time:
+                        else:
                             # When evaluating with an average only use same land-type as station.
-                            land_val = get_land_value(wrf_data.ncfile,\
-                                                      wrf_data.landvalues[j, :, :],\
-                                                      obs.obs_lat_list[i], obs.obs_lon_list[i])
+                            landmask = station["LANDMASK"][j-steps[0], column[i]]
+                            if station_land is not None:
+                                land_val = station_land[i]
+                            else:
+                                land_val = landmask[1, 1]
 
                             #These conditional handle if the wrf land type is wrong
                             if land_val == 0.0 and obs.fm_string_list[i] not in marine_list:
@@ -243,10 +254,9 @@ def model_analysis_timeseries(stats, obs):
                                 land_val = 0.0
 
                             #Get the WRF variable's values for this time and location
-                            trim_wrf_var = get_values_loc(wrf_data.ncfile,\
-                                                  wrf_data.wrf_var[j, :, :],\
-                                                  wrf_data.landvalues[j, :, :], land_val, \
-                                                  obs.obs_lat_list[i], obs.obs_lon_list[i],\
+                            trim_wrf_var = get_values_stencil(\
+                                                  station[variable][j-steps[0], column[i]],\
+                                                  landmask, land_val,\
                                                   analysis_type=stats.single_point_analysis)
 
                             if not fillHeaders and wrf_data.wrf_dt[j] != lastJ:
@@ -313,16 +323,6 @@ def model_analysis_timeseries(stats, obs):
                                     half_hourly_analysis[k, which_row, hha_idx_lst[k,\
                                                                    which_row]] = stat_value
 
-                        #This will always happen even if there is no wrf match to the t_time.
-                        elif obs.t_time[i] != wrf_data.wrf_dt[j]+lead_time and\
-                                        wrf_data.wrf_dt[j]+lead_time == wrf_data.wrf_dt[-1]+lead_time:
-                            continue
-
-                        #This will always happen at the end of the iteration or if no match.
-                        elif obs.t_time[i]+lead_time == obs.t_time[-1]+lead_time:
-                            continue
-                        #WRF Data outside analysis window
-
                 # MAKE TRUE TO PREVENT HEADERS FROM BEING REFILLED EACH TIME
                 fillHeaders = True
 
@@ -463,6 +463,9 @@ def model_analysis_timeseries(stats, obs):
                 str(stats.analysis_interval_min)+leadlagstr+".csv"
 
             table.to_csv(csv_outfile, index=False, float_format='%.3f')
+    pool.print_info()
+    pool.clear()
+
     #List any locations with the wrong land type in WRF from what was expected
     if len(badlist) > 0:
         print_bad_output(badlist)